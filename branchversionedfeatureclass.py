@@ -1,7 +1,11 @@
 import arcpy
 import os
+import re
 import sys
+import time
+import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from arcgis.gis import GIS
 from arcgis.features import FeatureLayer, FeatureLayerCollection
 from arcgis.features._version import VersionManager, Version
@@ -68,24 +72,324 @@ def create_new_version(flc_id, version_name, gis_con):
         print(e)
 
 
+def field_pairs(write_field, read_field):
+    """
+    Pairs up the write and read fields so one or many fields can be loaded at once
+    :param write_field: Name of the feature layer field to update, or a list of names; STRING or LIST
+    :param read_field: Name of the dataframe field with the new data, or a list of names in the same order as
+                       write_field; STRING or LIST
+    :return: list of the write fields and list of the read fields; LIST, LIST
+    """
+    if isinstance(write_field, str):
+        write_field = [write_field]
+    if isinstance(read_field, str):
+        read_field = [read_field]
+    if len(write_field) != len(read_field):
+        raise ValueError('write_field and read_field need to have the same number of fields')
+    return list(write_field), list(read_field)
+
+
+def build_join_index(read_df, read_id, read_fields):
+    """
+    Builds a dictionary from the data load dataframe so each feature can be joined with a single lookup instead of
+    searching the dataframe
+    :param read_df: The dataframe for the data that will update the feature layer; Pandas DataFrame
+    :param read_id: The name of the field for the update dataframe that will join to the feature layer; STRING
+    :param read_fields: List of the dataframe fields that contain the new data; LIST
+    :return: Dictionary where the key is the id and the value is a tuple of the new values in read_fields order; DICT
+    """
+    # Keep the first record for an id, same as the old .values[0] lookup did
+    unique_df = read_df.drop_duplicates(subset=read_id, keep='first')
+    # Turn NaN into None so it goes to the service as null and compares equal to an existing null
+    columns = [unique_df[fld].astype(object).where(unique_df[fld].notna(), None).tolist() for fld in read_fields]
+    return dict(zip(unique_df[read_id].tolist(), zip(*columns)))
+
+
+def join_features(features, join_index, write_id, write_fields):
+    """
+    Writes the joined values onto the features. Note, this doesn't update the feature layer in portal, rather the
+    features that are a copy of the features of the feature layer
+    :param features: Features from a feature set of the feature layer; LIST
+    :param join_index: Dictionary made by build_join_index(); DICT
+    :param write_id: The name of the field for the feature layer that will join to the new data; STRING
+    :param write_fields: List of the feature layer fields to update, same order as the join_index values; LIST
+    :return: List of only the features that had a value change; LIST
+    """
+    changed_features = []
+    for feature in features:
+        new_values = join_index.get(feature.attributes[write_id])
+        if new_values is None:  # The feature is not in the data load
+            continue
+        changed = False
+        for fld, value in zip(write_fields, new_values):
+            if feature.attributes.get(fld) != value:
+                feature.attributes[fld] = value
+                changed = True
+        if changed:
+            changed_features.append(feature)
+    return changed_features
+
+
+def build_where_clauses(id_field, id_values, chunk_size=500, max_length=4000):
+    """
+    Makes a list of where clauses that select the ids with IN lists. The ids are split into chunks so each request stays
+    under the URL and body limits of the service
+    :param id_field: Name of the field the ids are in; STRING
+    :param id_values: The id values to select; LIST
+    :param chunk_size: Max number of ids in a single IN list; INT
+    :param max_length: Max number of characters in a single where clause; INT
+    :return: list of where clauses; LIST
+    """
+    where_clauses = []
+    chunk = []
+    chunk_length = 0
+    for value in id_values:
+        if value is None or pd.isna(value):  # A null or NaN id can't match with IN
+            continue
+        # Quote the text values, doubling any single quotes
+        if isinstance(value, str):
+            sql_value = "'" + value.replace("'", "''") + "'"
+        else:
+            sql_value = str(value)
+        # Start a new chunk when this one is full
+        if chunk and (len(chunk) >= chunk_size or chunk_length + len(sql_value) + 1 > max_length):
+            where_clauses.append(f"{id_field} IN ({','.join(chunk)})")
+            chunk = []
+            chunk_length = 0
+        chunk.append(sql_value)
+        chunk_length += len(sql_value) + 1
+    if chunk:
+        where_clauses.append(f"{id_field} IN ({','.join(chunk)})")
+    return where_clauses
+
+
+def query_by_ids(fl, id_field, id_values, out_fields, chunk_size=500):
+    """
+    Queries only the features that have one of the ids, and only the fields that are needed. Geometry is not returned
+    and the results are paged by OID using the layer's maxRecordCount
+    :param fl: The feature layer to query; ESRI FeatureLayer Object
+    :param id_field: Name of the field the ids are in; STRING
+    :param id_values: The id values to select; LIST
+    :param out_fields: Fields to return, the OID field is always added; LIST
+    :param chunk_size: Max number of ids in a single IN list; INT
+    :return: List of features; LIST
+    """
+    # Always include the OID so the features can be used for edits
+    oid_field = fl.properties.objectIdField
+    fields = list(dict.fromkeys([oid_field] + list(out_fields)))  # Removes duplicates but keeps the order
+    page_size = fl.properties.get('maxRecordCount', 1000)
+
+    features = []
+    for where in build_where_clauses(id_field, id_values, chunk_size=chunk_size):
+        # Page through the results of the chunk in OID order, each page starts after the last OID of the one before.
+        # The FeatureSet does not keep exceededTransferLimit and a short page does not mean the chunk is done, so
+        # paging stops at the first empty page
+        last_oid = None
+        while True:
+            page_where = where if last_oid is None else f'({where}) AND {oid_field} > {last_oid}'
+            fset = fl.query(where=page_where, out_fields=','.join(fields), return_geometry=False,
+                            order_by_fields=f'{oid_field} ASC', result_record_count=page_size,
+                            return_all_records=False)
+            if not fset.features:
+                break
+            features.extend(fset.features)
+            last_oid = fset.features[-1].attributes[oid_field]
+    return features
+
+
+# HTTP status codes that could go away if the request is sent again
+TRANSIENT_STATUS_CODES = {429, 500, 502, 503, 504}
+# Status codes in the error messages from the ArcGIS API, EX: 'Error Code: 503' or '503 Server Error'
+STATUS_CODE_PATTERN = re.compile(r'(?:error code|status code|http error)\W*(\d{3})\b|^(\d{3}) (?:server|client) error',
+                                 re.IGNORECASE)
+
+
+class EditSummary:
+    """
+    Merges the per-feature results of the chunks sent by submit_edits() into one summary
+    """
+    def __init__(self):
+        self.results = {'addResults': [], 'updateResults': [], 'deleteResults': []}
+        self.chunk_errors = []  # [result key, number of edits in the chunk, error message] for chunks that never went
+
+    def add_result(self, edit_result):
+        """Adds the result dictionary returned from an edit call"""
+        for key in self.results:
+            self.results[key].extend(edit_result.get(key) or [])
+
+    def add_chunk_error(self, key, chunk_size, error):
+        """Records a chunk that failed to send after all of the retries"""
+        self.chunk_errors.append([key, chunk_size, str(error)])
+
+    def counts(self):
+        """
+        Counts the successes and failures for each type of edit
+        :return: {'addResults': [successes, failures], ...}; DICT
+        """
+        count_dict = {}
+        for key, result_list in self.results.items():
+            successes = sum(1 for result in result_list if result.get('success'))
+            count_dict[key] = [successes, len(result_list) - successes]
+        for key, chunk_size, error in self.chunk_errors:
+            count_dict[key][1] += chunk_size
+        return count_dict
+
+    @property
+    def succeeded(self):
+        """Total number of edits that succeeded"""
+        return sum(count[0] for count in self.counts().values())
+
+    @property
+    def failed(self):
+        """Total number of edits that failed"""
+        return sum(count[1] for count in self.counts().values())
+
+    def errors(self):
+        """Returns a list of the error messages from the failed edits and chunks"""
+        error_list = [result.get('error') for result_list in self.results.values() for result in result_list
+                      if not result.get('success')]
+        error_list.extend(error for key, chunk_size, error in self.chunk_errors)
+        return error_list
+
+    def __repr__(self):
+        counts = self.counts()
+        return (f'EditSummary(adds={counts["addResults"]}, updates={counts["updateResults"]}, '
+                f'deletes={counts["deleteResults"]}, succeeded={self.succeeded}, failed={self.failed})')
+
+
+def is_transient_error(error):
+    """
+    Checks if an error from a request is one that could go away if the request is sent again
+    :param error: The exception raised by the request; Exception
+    :return: True if the request should be retried; BOOL
+    """
+    if isinstance(error, (ConnectionError, TimeoutError, requests.exceptions.ConnectionError,
+                          requests.exceptions.Timeout)):
+        return True
+    response = getattr(error, 'response', None)
+    status_code = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    if status_code is not None:
+        return int(status_code) in TRANSIENT_STATUS_CODES
+    for match in STATUS_CODE_PATTERN.finditer(str(error)):
+        if int(match.group(1) or match.group(2)) in TRANSIENT_STATUS_CODES:
+            return True
+    return False
+
+
+def _send_chunk(edit_function, edit_type, chunk, max_retries, backoff):
+    """
+    Sends a single chunk of edits, retrying transient failures with an exponential backoff. Only updates and deletes
+    are retried, adds are not since the server may have made the features before the request failed
+    :return: result dictionary from the edit call
+    """
+    attempt = 0
+    while True:
+        try:
+            return edit_function(**{edit_type: chunk}) or {}
+        except Exception as e:
+            attempt += 1
+            if edit_type == 'adds' or attempt > max_retries or not is_transient_error(e):
+                raise
+            wait = backoff * (2 ** (attempt - 1))
+            print(f'{edit_type} chunk failed ({e}), retry {attempt} of {max_retries} in {wait} seconds')
+            time.sleep(wait)
+
+
+def submit_edits(edit_function, adds=None, updates=None, deletes=None, chunk_size=500, max_workers=4, max_retries=3,
+                 backoff=2):
+    """
+    Splits the edits into chunks and sends them at the same time from a bounded thread pool. Update and delete chunks
+    that fail with a transient HTTP error are retried. The results are merged into a single EditSummary.
+    Best if this code is used like:
+    'submit_edits(lambda **edits: version.edit(versioned_fl, rollback_on_failure=True, **edits), updates=features)'
+    or 'submit_edits(fl.edit_features, updates=features)'
+    :param edit_function: Function that takes adds, updates or deletes keyword arguments and returns the edit result
+                          dictionary, like Version.edit or FeatureLayer.edit_features; FUNCTION
+    :param adds: Features to add; LIST
+    :param updates: Features to update; LIST
+    :param deletes: OIDs to delete, as a list or a comma separated string; LIST or STRING
+    :param chunk_size: Max number of edits in a single request; INT
+    :param max_workers: Max number of requests sent at the same time. Use 1 to send the chunks one after another; INT
+    :param max_retries: Number of times an update or delete chunk is sent again after a transient failure; INT
+    :param backoff: Seconds to wait before the first retry, doubles for every retry after that; FLOAT
+    :return: The merged results; EditSummary
+    """
+    if isinstance(deletes, str):
+        deletes = [oid.strip() for oid in deletes.split(',') if oid.strip()]
+
+    # Make the list of chunks to send, [edit keyword, result key, chunk]
+    chunks = []
+    for edit_type, result_key, edits in [['adds', 'addResults', adds], ['updates', 'updateResults', updates],
+                                         ['deletes', 'deleteResults', deletes]]:
+        edits = list(edits or [])
+        for i in range(0, len(edits), chunk_size):
+            chunks.append([edit_type, result_key, edits[i:i + chunk_size]])
+
+    summary = EditSummary()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [[executor.submit(_send_chunk, edit_function, edit_type, chunk, max_retries, backoff), result_key,
+                    len(chunk)] for edit_type, result_key, chunk in chunks]
+        for future, result_key, num_edits in futures:
+            try:
+                summary.add_result(future.result())
+            except Exception as e:
+                summary.add_chunk_error(result_key, num_edits, e)
+    return summary
+
+
+def finish_edit_session(version, summary, post_to_default):
+    """
+    Ends the edit session of a version after submit_edits(). If any chunk failed the whole session is discarded, like
+    a single rollback_on_failure edit, so nothing is posted. Otherwise the edits are posted to Default if asked and
+    saved
+    :param version: Version in an edit session; Version
+    :param summary: The results from submit_edits(); EditSummary
+    :param post_to_default: If True, posts the edits to default; BOOL
+    :return: True if the edits were saved; BOOL
+    """
+    if summary.failed > 0:
+        print('Data failed to update, discarding the edits')
+        for error in summary.errors():
+            print(error)
+        version.stop_editing(save=False)
+        return False
+    # Push the edit from the version to Default
+    if post_to_default:
+        rec_result = version.reconcile(end_with_conflict=False, with_post=True, conflict_detection='byObject',
+                                       future=False)
+        # Check the result
+        if rec_result['didPost'] == True:
+            print('Result Posted')
+        elif rec_result['didPost'] == False:
+            print('Result did not post')
+    # Save the edit
+    version.stop_editing(save=True)
+    return True
+
+
 # ======================================================================================================================
 # WORKFLOW FUNCTIONS
 # ======================================================================================================================
 
 # Tool to add data to a branch versioned feature class
-def data_update_directly_to_default(flc_id, fl_idx, write_field, write_id, read_df, read_field, read_id, gis_info=[]):
+def data_update_directly_to_default(flc_id, fl_idx, write_field, write_id, read_df, read_field, read_id, gis_info=[],
+                                    chunk_size=500, max_workers=4):
     """
     Performs a data load for a branch versioned feature layer in Portal
     :param flc_id: the unique identifying string (Service Item Id) for a feature service; STRING
     :param fl_idx: The index for the featyre layer in the feature service; INT
-    :param write_field: The name of the field for the feature layer that will be updated
+    :param write_field: The name of the field for the feature layer that will be updated. A list of names can be given
+                        to update several fields in one pass
     :param write_id: The name of the field for the feature layer that will join to the new dataframe
     :param read_df: The dataframe for the data that will update the feature layer. Needs at least two columns, an index
                     to join to the feature layer and an update column that contains the new data
-    :param read_field: The name of the field for the dataframe that contains the new update field
+    :param read_field: The name of the field for the dataframe that contains the new update field. If write_field is a
+                       list this is a list in the same order
     :param read_id: The name of the field for the update dataframe that will join to the feature layer
     :param gis_info: [portal_url, AD\\<account>, <AD Password>]. If none then current pro connection will be used; List
-    :return:
+    :param chunk_size: Max number of features sent in a single edit request; INT
+    :param max_workers: Max number of edit requests sent at the same time; INT
+    :return: The results of the edits; EditSummary
     """
 
     # Connect to a GIS
@@ -101,35 +405,23 @@ def data_update_directly_to_default(flc_id, fl_idx, write_field, write_id, read_
     # Connect to the feature layer
     fl = FeatureLayer(f'{flc.url}/{fl_idx}', gis=gis)
 
-    # Get a feature set of the feature layer by creating an empty query
-    fset = fl.query()
-
-    # make a dataframe based on the feature set
-    # fl_df = fset.sdf
-
-    # Get the features of the feature set
-    features_to_update = fset.features
-
-    # Update the features of the feature layer based on the data load df
-    # Note, this doesn't actually update the feature layer in portal, rather a list that is a copy of the features of
-    # the feature layer
-    for feature in features_to_update:
-        for fid in read_df[read_id]:
-            if feature.attributes[write_id] == fid:
-                specific_value = read_df.loc[read_df[read_id] == fid, read_field].values[0]
-                feature.attributes[write_field] = specific_value
-
-    # features_to_update contains all the features, however, likely only a subset will need to be updated. Only take the
-    # updated features to update the feature layer
-    # Convert the oid column to a list
-    records_to_keep_list = read_df[read_id].tolist()
-    features_to_update_reduced = []
-    for feature in features_to_update:
-        if feature.attributes[write_field] in records_to_keep_list:
-            features_to_update_reduced.append(feature)
+    # Index the data load df by its id
+    write_fields, read_fields = field_pairs(write_field, read_field)
+    join_index = build_join_index(read_df, read_id, read_fields)
+
+    # Get only the features that are in the data load, with only the fields needed for the update
+    features_to_update = query_by_ids(fl, write_id, list(join_index), [write_id] + write_fields)
+
+    # Join the data load df to the features, only the features that changed are kept
+    features_to_update_reduced = join_features(features_to_update, join_index, write_id, write_fields)
 
     # Push the edits to the feature layer in Portal
-    fl.edit_features(updates=features_to_update_reduced)
+    if not features_to_update_reduced:
+        print('No features needed to be updated')
+    summary = submit_edits(fl.edit_features, updates=features_to_update_reduced, chunk_size=chunk_size,
+                           max_workers=max_workers)
+    print(summary)
+    return summary
 
 
 def data_update_old(flc_id, fl_idx, write_field, write_id, read_df, read_field, read_id, gis_info=[],
@@ -138,11 +430,13 @@ def data_update_old(flc_id, fl_idx, write_field, write_id, read_df, read_field,
     Performs a data load for a branch versioned feature layer in Portal
     :param flc_id: the unique identifying string (Service Item Id) for a feature service; STRING
     :param fl_idx: The index for the featyre layer in the feature service; INT
-    :param write_field: The name of the field for the feature layer that will be updated
+    :param write_field: The name of the field for the feature layer that will be updated. A list of names can be given
+                        to update several fields in one pass
     :param write_id: The name of the field for the feature layer that will join to the new dataframe
     :param read_df: The dataframe for the data that will update the feature layer. Needs at least two columns, an index
                     to join to the feature layer and an update column that contains the new data
-    :param read_field: The name of the field for the dataframe that contains the new update field
+    :param read_field: The name of the field for the dataframe that contains the new update field. If write_field is a
+                       list this is a list in the same order
     :param read_id: The name of the field for the update dataframe that will join to the feature layer
     :param gis_info: [portal_url, AD\\<account>, <AD Password>]. If none then current pro connection will be used; List
     :param version_name: Name for the version where the editing will take place
@@ -186,36 +480,26 @@ def data_update_old(flc_id, fl_idx, write_field, write_id, read_df, read_field,
         # Get the feature layer in the version
         versioned_fl = version.layers[int(fl_idx)]
 
-        # Get a feature set of the feature layer by creating an empty query
-        fset = versioned_fl.query()
-
-        # Get all the features of the feature set
-        all_features = fset.features
-
-        # Update the features of the feature layer based on the data load df
-        # Note, this doesn't actually update the feature layer in portal, rather a list that is a copy of the features
-        # of the feature layer
-        for feature in all_features:
-            for fid in read_df[read_id]:
-                if feature.attributes[write_id] == fid:
-                    specific_value = read_df.loc[read_df[read_id] == fid, read_field].values[0]
-                    feature.attributes[write_field] = specific_value
-
-        # all_features contains all the features, however, likely only a subset will need to be updated. Only take the
-        # updated features to update the feature layer
-        # Convert the oid column to a list
-        records_to_keep_list = read_df[read_id].tolist()
-        features_to_update = []
-        for feature in all_features:
-            if feature.attributes[write_id] in records_to_keep_list:
-                features_to_update.append(feature)
+        # Index the data load df by its id
+        write_fields, read_fields = field_pairs(write_field, read_field)
+        join_index = build_join_index(read_df, read_id, read_fields)
+        # Get only the features that are in the data load, with only the fields needed for the update
+        all_features = query_by_ids(versioned_fl, write_id, list(join_index), [write_id] + write_fields)
+        # Join the data load df to the features. Note, this doesn't actually update the feature layer in portal,
+        # rather the copies of the features, and only the features that changed are kept
+        features_to_update = join_features(all_features, join_index, write_id, write_fields)
 
         # Start an edit session
         version.start_editing()
         # Apply the edit to a version of the feature layer
-        update_result = version.edit(versioned_fl, updates=features_to_update, rollback_on_failure=True)
+        if features_to_update:
+            update_result = version.edit(versioned_fl, updates=features_to_update, rollback_on_failure=True)
+        else:
+            update_result = None
         # Check the result
-        if update_result == None:
+        if not features_to_update:
+            print('No features needed to be updated')
+        elif update_result == None:
             print('No update happened, something went wrong')
         elif update_result['updateResults'][0]['success'] == True:
             print('Data updated successfully')
@@ -245,23 +529,28 @@ def data_update_old(flc_id, fl_idx, write_field, write_id, read_df, read_field,
 
 
 def data_update(flc_id, fl_idx, write_field, write_id, read_df, read_field, read_id, gis_info=[],
-              version_name='tool_version', post_to_default=True):
+              version_name='tool_version', post_to_default=True, chunk_size=500, max_workers=1):
     """
     Performs a data load for a branch versioned feature layer in Portal
     :param flc_id: the unique identifying string (Service Item Id) for a feature service; STRING
     :param fl_idx: The index for the featyre layer in the feature service; INT
-    :param write_field: The name of the field for the feature layer that will be updated
+    :param write_field: The name of the field for the feature layer that will be updated. A list of names can be given
+                        to update several fields in one pass
     :param write_id: The name of the field for the feature layer that will join to the new dataframe
     :param read_df: The dataframe for the data that will update the feature layer. Needs at least two columns, an index
                     to join to the feature layer and an update column that contains the new data
-    :param read_field: The name of the field for the dataframe that contains the new update field
+    :param read_field: The name of the field for the dataframe that contains the new update field. If write_field is a
+                       list this is a list in the same order
     :param read_id: The name of the field for the update dataframe that will join to the feature layer
     :param gis_info: [portal_url, AD\\<account>, <AD Password>]. If none then current pro connection will be used; List
     :param version_name: Name for the version where the editing will take place
     :param post_to_default: If True, posts the change from the envt to default version, if False change remain in the
     version. If this tool is False, best practice is to change the version name from the default 'tool_version' to a
     user named version; BOOL
-    :return:
+    :param chunk_size: Max number of features sent in a single edit request; INT
+    :param max_workers: Max number of edit requests sent at the same time. Keep this at 1 unless the server is known to
+                        handle parallel edits in one version edit session; INT
+    :return: The merged edit results, None if the update did not get to the edit step; EditSummary
     """
 
     # Connect to a GIS
@@ -269,53 +558,32 @@ def data_update(flc_id, fl_idx, write_field, write_id, read_df, read_field, read
 
     version, all_versions = create_new_version(flc_id=flc_id, version_name=version_name, gis_con=gis)
 
+    summary = None
     try:
         # Get the feature layer in the version
         versioned_fl = version.layers[int(fl_idx)]
-        # Get a feature set of the feature layer by creating an empty query
-        fset = versioned_fl.query()
-        # Get all the features of the feature set
-        all_features = fset.features
-        # Update the features of the feature layer based on the data load df
-        # Note, this doesn't actually update the feature layer in portal, rather a list that is a copy of the features
-        # of the feature layer
-        for feature in all_features:
-            for fid in read_df[read_id]:
-                if feature.attributes[write_id] == fid:
-                    specific_value = read_df.loc[read_df[read_id] == fid, read_field].values[0]
-                    feature.attributes[write_field] = specific_value
-
-        # all_features contains all the features, however, likely only a subset will need to be updated. Only take the
-        # updated features to update the feature layer
-        # Convert the oid column to a list
-        records_to_keep_list = read_df[read_id].tolist()
-        features_to_update = []
-        for feature in all_features:
-            if feature.attributes[write_id] in records_to_keep_list:
-                features_to_update.append(feature)
+        # Index the data load df by its id
+        write_fields, read_fields = field_pairs(write_field, read_field)
+        join_index = build_join_index(read_df, read_id, read_fields)
+        # Get only the features that are in the data load, with only the fields needed for the update
+        all_features = query_by_ids(versioned_fl, write_id, list(join_index), [write_id] + write_fields)
+        # Join the data load df to the features. Note, this doesn't actually update the feature layer in portal,
+        # rather the copies of the features, and only the features that changed are kept
+        features_to_update = join_features(all_features, join_index, write_id, write_fields)
 
         # Start an edit session
         version.start_editing()
-        # Apply the edit to a version of the feature layer
-        update_result = version.edit(versioned_fl, updates=features_to_update, rollback_on_failure=True)
+        # Apply the edit to a version of the feature layer in chunks
+        summary = submit_edits(lambda **edits: version.edit(versioned_fl, rollback_on_failure=True, **edits),
+                               updates=features_to_update, chunk_size=chunk_size, max_workers=max_workers)
         # Check the result
-        if update_result == None:
-            print('No update happened, something went wrong')
-        elif update_result['updateResults'][0]['success'] == True:
+        print(summary)
+        if not features_to_update:
+            print('No features needed to be updated')
+        elif summary.failed == 0:
             print('Data updated successfully')
-        elif update_result['updateResults'][0]['success'] == False:
-            print('Data failed to update')
-        # Push the edit from the version to Default
-        if post_to_default:
-            rec_result = version.reconcile(end_with_conflict=False, with_post=True, conflict_detection='byObject',
-                                           future=False)
-            # Check the result
-            if rec_result['didPost'] == True:
-                print('Result Posted')
-            elif rec_result['didPost'] == False:
-                print('Result did not post')
-        # Save the edit
-        version.stop_editing(save=True)
+        # Post and save the edits, or discard all of them if a chunk failed
+        finish_edit_session(version, summary, post_to_default)
     except Exception as e:
         print(e)
         print('Deleting the version')
@@ -328,6 +596,7 @@ def data_update(flc_id, fl_idx, write_field, write_id, read_df, read_field, read
             v_name = v.properties['versionName'].rsplit('.', 1)[1]  # Get the name of the version w/o user information
             if v_name == version_name:  # Finds if it exists
                 v.delete()  # Deletes the version
+    return summary
 
 
 # Still under construction
@@ -387,7 +656,7 @@ def add_new_records(flc_id, fl_idx, write_field, write_id, read_df, read_field,
 
 # Mostly works, the delete part works on VM06 but not VM07
 def delete_records(flc_id, fl_idx, oid_del_list, gis_info=[], version_name='tool_version',
-                   post_to_default=True):
+                   post_to_default=True, chunk_size=500, max_workers=1):
     """
     Deletes records from a branch versioned feature layer. Deletes from a version, defaults to pushing the change to
     default
@@ -399,7 +668,10 @@ def delete_records(flc_id, fl_idx, oid_del_list, gis_info=[], version_name='tool
     :param post_to_default: If True, posts the change from the envt to default version, if False change remain in the
     version. If this tool is False, best practice is to change the version name from the default 'tool_version' to a
     user named version; BOOL
-    :return:
+    :param chunk_size: Max number of OIDs sent in a single edit request; INT
+    :param max_workers: Max number of edit requests sent at the same time. Keep this at 1 unless the server is known to
+                        handle parallel edits in one version edit session; INT
+    :return: The merged edit results, None if the delete did not get to the edit step; EditSummary
     """
     # Connect to a GIS
     gis = connect_to_gis(gis_info)
@@ -407,32 +679,23 @@ def delete_records(flc_id, fl_idx, oid_del_list, gis_info=[], version_name='tool
     # Create the version and all_version list
     version, all_versions = create_new_version(flc_id=flc_id, version_name=version_name, gis_con=gis)
 
+    summary = None
     try:
         # Get the feature layer in the version
         versioned_fl = version.layers[int(fl_idx)]
         # Start an edit session
         version.start_editing()
-        # Apply the edit to a version of the feature layer
-        update_result = version.edit(versioned_fl, deletes=oid_del_list, rollback_on_failure=True)
+        # Apply the edit to a version of the feature layer in chunks
+        summary = submit_edits(lambda **edits: version.edit(versioned_fl, rollback_on_failure=True, **edits),
+                               deletes=oid_del_list, chunk_size=chunk_size, max_workers=max_workers)
         # Check the result
-        if update_result == None:
+        print(summary)
+        if summary.succeeded == 0 and summary.failed == 0:
             print('No update happened, something went wrong')
-        elif update_result['deleteResults'][0]['success'] == True:
+        elif summary.failed == 0:
             print('Data updated successfully')
-        elif update_result['deleteResults'][0]['success'] == False:
-            print('Data failed to update')
-            print(update_result.get('deleteResults', [{}])[0].get('error', 'Unknown error'))
-        # Push the edit from the version to Default
-        if post_to_default:
-            rec_result = version.reconcile(end_with_conflict=False, with_post=True, conflict_detection='byObject',
-                                           future=False)
-            # Check the result
-            if rec_result['didPost'] == True:
-                print('Result Posted')
-            elif rec_result['didPost'] == False:
-                print('Result did not post')
-        # Save the edit
-        version.stop_editing(save=True)
+        # Post and save the edits, or discard all of them if a chunk failed
+        finish_edit_session(version, summary, post_to_default)
     except Exception as e:
         print(e)
         print('End the editing session')
@@ -457,6 +720,7 @@ def delete_records(flc_id, fl_idx, oid_del_list, gis_info=[], version_name='tool
         except Exception as e:
             print(e)
             print('Trouble deleting the version')
+    return summary
 
 
 def schema_change(flc_id, sde_con):
@@ -3,15 +3,204 @@
 
 
 # Imports
+from datetime import datetime
+import csv
+import hashlib
+import heapq
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+try:
+    import cx_Oracle
+except ImportError:  # Only needed to connect to Oracle, the other tools work with any DB-API connection
+    cx_Oracle = None
 
 
 # Functions
 
 
+########################################################################################################################
+# Connection Pool
+########################################################################################################################
+class ConnectionPool:
+    '''
+    Keeps database connections open so they can be reused instead of connecting every time. Works with any DB-API
+    driver, the connect function is called whenever the pool needs a new connection. Best if used like:
+    'with pool.acquire() as db:'
+    '''
+    def __init__(self, connect, min_size=1, max_size=5, timeout=30, ping_query='SELECT 1'):
+        '''
+        :param connect: Function with no arguments that returns a new connection,
+                        EX: lambda: cx_Oracle.connect("site/pwd@dsd"); Function
+        :param min_size: Number of connections opened right away and kept open; Int
+        :param max_size: Max number of connections open at the same time; Int
+        :param timeout: Seconds to wait for a connection when all of them are in use; Float
+        :param ping_query: Query used to check a connection when the driver has no ping(); String
+        '''
+        if min_size > max_size:
+            raise ValueError('min_size cannot be larger than max_size')
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_query = ping_query
+        self._condition = threading.Condition()
+        self._idle = []  # Connections that are open and not in use
+        self._size = 0  # Number of connections open, in use or idle
+        self._closed = False
+        for _ in range(min_size):
+            self._idle.append(self.connect())
+            self._size += 1
+
+    def is_healthy(self, db):
+        '''
+        Checks that a connection still works
+        :param db: The connection to check; Connection Class
+        :return: True if the connection works
+        '''
+        try:
+            if hasattr(db, 'ping'):
+                db.ping()
+            else:
+                cursor = db.cursor()
+                cursor.execute(self.ping_query)
+                cursor.fetchall()
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _close_quietly(self, db):
+        try:
+            db.close()
+        except Exception:
+            pass
+
+    def get(self):
+        '''
+        Takes a connection out of the pool, opening a new one if none are idle and the pool is not full. Waits for a
+        connection to be released when the pool is full. Use release() to put it back, or use acquire() instead
+        :return: A connection that passed a health check
+        '''
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError('The connection pool is closed')
+                if self._idle:
+                    db = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    db = None
+                    self._size += 1  # Hold the spot while connecting
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f'No connection was released within {self.timeout} seconds')
+                self._condition.wait(remaining)
+
+        # Replace a broken connection with a new one
+        if db is not None and not self.is_healthy(db):
+            self._close_quietly(db)
+            db = None
+        if db is None:
+            try:
+                db = self.connect()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+        return db
+
+    def release(self, db, discard=False):
+        '''
+        Puts a connection back in the pool. Anything not committed is rolled back. If the pool is closed the connection
+        is closed
+        :param db: The connection from get(); Connection Class
+        :param discard: If true, the connection is closed instead of reused; Bool
+        '''
+        if self._closed:
+            discard = True
+        if not discard:
+            try:
+                db.rollback()
+            except Exception:
+                discard = True
+        with self._condition:
+            if discard or self._closed:
+                self._close_quietly(db)
+                self._size -= 1
+            else:
+                self._idle.append(db)
+            self._condition.notify()
+
+    @contextmanager
+    def acquire(self):
+        '''
+        Context manager that gets a connection and always puts it back
+        '''
+        db = self.get()
+        try:
+            yield db
+        except Exception:
+            self.release(db, discard=not self.is_healthy(db))
+            raise
+        else:
+            self.release(db)
+
+    def close(self):
+        '''
+        Closes the idle connections. Connections still in use are closed when they are released, and get() raises
+        after the pool is closed
+        '''
+        with self._condition:
+            self._closed = True
+            for db in self._idle:
+                self._close_quietly(db)
+                self._size -= 1
+            self._idle = []
+            self.min_size = 0
+            # Wake up anyone waiting in get() so they see the pool is closed
+            self._condition.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def oracle_pool(oracle_instance, oracle_pwd, min_size=1, max_size=5):
+    '''
+    Makes a connection pool for the Oracle database
+    :param oracle_instance: The Oracle instance, EX: "dsd"; String
+    :param oracle_pwd: The password for the site user; String
+    :param min_size: Number of connections kept open; Int
+    :param max_size: Max number of connections open at the same time; Int
+    :return: ConnectionPool
+    '''
+    return ConnectionPool(lambda: cx_Oracle.connect("site/" + oracle_pwd + "@" + oracle_instance), min_size=min_size,
+                          max_size=max_size)
+
+
 ########################################################################################################################
 # Oracle Database Connection Start Function
 ########################################################################################################################
-def db_start(oracle_instance, oracle_pwd):
+def db_start(oracle_instance, oracle_pwd, pool=None):
+    '''
+    Connects to Oracle
+    :param oracle_instance: The Oracle instance, EX: "dsd"; String
+    :param oracle_pwd: The password for the site user; String
+    :param pool: If given, the connection is taken from this pool and has to be given back with pool.release(db);
+                 ConnectionPool
+    :return: The database connection and a cursor
+    '''
     print("Connecting to Oracle")
     # oracle_instance = "dsd"
     # oracle_pwd = "SITE"
@@ -19,61 +208,513 @@ def db_start(oracle_instance, oracle_pwd):
     # tableMapLayerMapLayerMetadata = "DSBC.MAPLAYER_MAPLAYER_METADATA"
     # tableJobLocTransaction = "P2K.JOB_LOC_TRANSACTION"
     # tableJobLocation = "P2K.JOB_LOCATION"
-    db = cx_Oracle.connect("site/" + oracle_pwd + "@" + oracle_instance)
+    if pool is not None:
+        db = pool.get()
+    else:
+        db = cx_Oracle.connect("site/" + oracle_pwd + "@" + oracle_instance)
     o_cursor = db.cursor()
     print("Success")
-    t.sleep(2)
     return db, o_cursor
 
 
 ########################################################################################################################
 # Run Oracle Query Function
 ########################################################################################################################
-def run_oracle_query(query, o_cursor, print_statement=False, commit=False, db=None):
+def run_oracle_query(query, o_cursor, print_statement=False, commit=False, db=None, binds=None, fetch_mode='all',
+                     arraysize=1000):
     '''
     This function runs a SQL query
-    :param query: The query to be run; String
+    :param query: The query to be run. Use bind variables (EX: 'WHERE JOB_ID = :job_id') instead of putting values in
+                  the query so the statement can be cached and reused; String
     :param o_cursor: The oracle cursor; Cursor Class?
     :param print_statement: If ture, it will print ift the function ran; Bool
     :param commit: 
     :param db: The database to run on; Class?
+    :param binds: Values for the bind variables, a dictionary for named binds or a list for positional binds; Dict or
+                  List
+    :param fetch_mode: How the results are returned. 'all' returns a list of all the rows, 'rows' returns a generator
+                       of the rows, 'dataframe' returns a generator of pandas dataframes with arraysize rows each,
+                       'columnar' returns a single dictionary of column name to list of values; String
+    :param arraysize: Number of rows fetched from the database at a time; Int
     :return:
     '''
-    o_cursor.execute(query)
+    o_cursor.arraysize = arraysize
+    if binds is None:
+        o_cursor.execute(query)
+    else:
+        o_cursor.execute(query, binds)
     if commit:
         db.commit()
         if(print_statement):
             print(query, ' Has successfully run')
-    else:
+    elif fetch_mode == 'all':
         return o_cursor.fetchall()
+    elif fetch_mode == 'rows':
+        return iterate_rows(o_cursor, arraysize)
+    elif fetch_mode == 'dataframe':
+        return iterate_dataframes(o_cursor, arraysize)
+    elif fetch_mode == 'columnar':
+        return fetch_columns(o_cursor, arraysize)
+    else:
+        raise ValueError(f"fetch_mode must be 'all', 'rows', 'dataframe' or 'columnar', not {fetch_mode}")
+
+
+def iterate_chunks(o_cursor, arraysize=1000):
+    '''
+    Fetches the results of an executed query arraysize rows at a time
+    :param o_cursor: A cursor that has run a query; Cursor Class
+    :param arraysize: Number of rows fetched at a time; Int
+    :return: A generator of lists of rows
+    '''
+    while True:
+        rows = o_cursor.fetchmany(arraysize)
+        if not rows:
+            break
+        yield rows
+
+
+def iterate_rows(o_cursor, arraysize=1000):
+    '''
+    Yields the rows of an executed query one at a time while only holding arraysize rows in memory
+    :param o_cursor: A cursor that has run a query; Cursor Class
+    :param arraysize: Number of rows fetched at a time; Int
+    :return: A generator of rows
+    '''
+    for rows in iterate_chunks(o_cursor, arraysize):
+        yield from rows
+
+
+def iterate_dataframes(o_cursor, arraysize=1000):
+    '''
+    Yields the results of an executed query as pandas dataframes of arraysize rows
+    :param o_cursor: A cursor that has run a query; Cursor Class
+    :param arraysize: Number of rows in each dataframe; Int
+    :return: A generator of pandas dataframes
+    '''
+    import pandas as pd
+    columns = [col[0] for col in o_cursor.description]
+    for rows in iterate_chunks(o_cursor, arraysize):
+        yield pd.DataFrame.from_records(rows, columns=columns)
+
+
+def fetch_columns(o_cursor, arraysize=1000):
+    '''
+    Reads the results of an executed query into a single columnar batch, like an Arrow record batch. Can be passed to
+    pyarrow.table() or pandas.DataFrame()
+    :param o_cursor: A cursor that has run a query; Cursor Class
+    :param arraysize: Number of rows fetched at a time; Int
+    :return: Dictionary of column name to list of values
+    '''
+    columns = [col[0] for col in o_cursor.description]
+    data = {col: [] for col in columns}
+    column_lists = [data[col] for col in columns]
+    for rows in iterate_chunks(o_cursor, arraysize):
+        for column_list, values in zip(column_lists, zip(*rows)):
+            column_list.extend(values)
+    return data
 
 
 ########################################################################################################################
-# Join two tables (WIP)
+# Join two tables
 ########################################################################################################################
-def table_join(tbl1, col1, tbl2, col2, join_type):
+# SQL for each join type
+JOIN_TYPES = {'inner': 'INNER JOIN', 'left outer': 'LEFT OUTER JOIN', 'right outer': 'RIGHT OUTER JOIN',
+              'full outer': 'FULL OUTER JOIN', 'cross': 'CROSS JOIN', 'natural': 'NATURAL JOIN'}
+
+
+def build_join_query(tbl1, col1, tbl2, col2, join_type, columns=None, where=None):
     '''
-    Joins two tables
+    Makes the SQL to join two tables in the database. Table 1 is aliased t1 and table 2 is aliased t2, so columns and
+    where can use 't1.COL' and 't2.COL'
     :param tbl1: The name of table 1; String
     :param col1: The name of table 1 column to join on; String
     :param tbl2: The name of table 2; String
     :param col2: The name of table 2 column to join with; String
-    :param join_type: The type of join. Either 'inner', 'right outer', 'left outer', 'cross', or 'natural'; String
-    :return: A joined table
+    :param join_type: The type of join. Either 'inner', 'right outer', 'left outer', 'full outer', 'cross', or
+                      'natural'; String
+    :param columns: The columns to return, all columns if None; List
+    :param where: Condition added as the WHERE clause so the database filters the rows; String
+    :return: The SQL query
+    '''
+    if join_type not in JOIN_TYPES:
+        raise ValueError(f"join_type must be one of {', '.join(JOIN_TYPES)}, not {join_type}")
+    select = ', '.join(columns) if columns else '*'
+    query = f'SELECT {select} FROM {tbl1} t1 {JOIN_TYPES[join_type]} {tbl2} t2'
+    if join_type not in ('cross', 'natural'):
+        query += f' ON t1.{col1} = t2.{col2}'
+    if where:
+        query += f' WHERE {where}'
+    return query
+
+
+def iterate_source(source, o_cursor=None, arraysize=1000):
+    '''
+    Reads a table as dictionaries one row at a time
+    :param source: A path to a .csv file, the name of a table in the database, or an iterable of dictionaries; String
+                   or Iterable
+    :param o_cursor: The cursor used to read a database table; Cursor Class
+    :param arraysize: Number of rows fetched from the database at a time; Int
+    :return: A generator of dictionaries
+    '''
+    if isinstance(source, str) and source.lower().endswith('.csv'):
+        with open(source, newline='') as f:
+            yield from csv.DictReader(f)
+    elif isinstance(source, str):
+        o_cursor.arraysize = arraysize
+        o_cursor.execute(f'SELECT * FROM {source}')
+        columns = [col[0] for col in o_cursor.description]
+        for row in iterate_rows(o_cursor, arraysize):
+            yield dict(zip(columns, row))
+    else:
+        yield from source
+
+
+def _join_key(row, key_columns):
+    '''
+    Makes the hash key for a row. Values are compared as text since a csv has no types. None if any value is null,
+    since nulls never match in a join
+    '''
+    key = tuple(row.get(col) for col in key_columns)
+    if any(value is None or value == '' for value in key):
+        return None
+    return tuple(str(value) for value in key)
+
+
+def hash_join(left, col1, right, col2, join_type='inner', build_side='right'):
+    '''
+    Joins two streams of dictionaries with a hash join. Only the build side is held in memory, so it should be the
+    smaller table, the other side is streamed through. Right columns with the same name as a left column get '_2' added
+    :param left: Rows of table 1; Iterable of dictionaries
+    :param col1: The name of table 1 column to join on; String
+    :param right: Rows of table 2; Iterable of dictionaries
+    :param col2: The name of table 2 column to join with; String
+    :param join_type: The type of join. Either 'inner', 'right outer', 'left outer', 'full outer', 'cross', or
+                      'natural'; String
+    :param build_side: 'left' or 'right', the side held in memory; String
+    :return: A generator of the joined rows as dictionaries
+    '''
+    if join_type not in JOIN_TYPES:
+        raise ValueError(f"join_type must be one of {', '.join(JOIN_TYPES)}, not {join_type}")
+    build_is_left = build_side == 'left'
+    build_rows = list(left if build_is_left else right)
+    probe_rows = iter(right if build_is_left else left)
+    keep_left = join_type in ('left outer', 'full outer')
+    keep_right = join_type in ('right outer', 'full outer')
+    keep_build, keep_probe = (keep_left, keep_right) if build_is_left else (keep_right, keep_left)
+
+    # Look at the first probe row to find the shared columns for a natural join
+    first_probe = next(probe_rows, None)
+    if join_type == 'natural':
+        build_columns = build_rows[0].keys() if build_rows else []
+        probe_columns = first_probe.keys() if first_probe is not None else []
+        key_columns = [col for col in build_columns if col in probe_columns]
+        build_key, probe_key = key_columns, key_columns
+    else:
+        key_columns = []
+        build_key, probe_key = ([col1], [col2]) if build_is_left else ([col2], [col1])
+
+    def combine(left_row, right_row):
+        joined = dict(left_row or {})
+        for col, value in (right_row or {}).items():
+            if col in key_columns:  # Natural join columns are only kept once
+                joined.setdefault(col, value)
+            elif col in joined and left_row:
+                joined[f'{col}_2'] = value
+            else:
+                joined[col] = value
+        return joined
+
+    def ordered(build_row, probe_row):
+        return combine(build_row, probe_row) if build_is_left else combine(probe_row, build_row)
+
+    # Build the hash table
+    hash_table = {}
+    if join_type != 'cross':
+        for idx, row in enumerate(build_rows):
+            key = _join_key(row, build_key)
+            if key is not None:
+                hash_table.setdefault(key, []).append(idx)
+    matched = [False] * len(build_rows) if keep_build else None
+
+    # Stream the probe side through the hash table
+    if first_probe is not None:
+        for probe_row in itertools.chain([first_probe], probe_rows):
+            if join_type == 'cross':
+                for build_row in build_rows:
+                    yield ordered(build_row, probe_row)
+                continue
+            key = _join_key(probe_row, probe_key)
+            matches = hash_table.get(key, []) if key is not None else []
+            for idx in matches:
+                if matched is not None:
+                    matched[idx] = True
+                yield ordered(build_rows[idx], probe_row)
+            if not matches and keep_probe:
+                yield ordered(None, probe_row)
+
+    # Outer join rows from the build side that never matched
+    if matched is not None:
+        for idx, build_row in enumerate(build_rows):
+            if not matched[idx]:
+                yield ordered(build_row, None)
+
+
+def table_join(tbl1, col1, tbl2, col2, join_type, o_cursor=None, columns=None, where=None, binds=None,
+               fetch_mode='all', arraysize=1000, build_side='right'):
+    '''
+    Joins two tables. If both are tables in the database the join, the columns and the where clause are run in the
+    database. Otherwise, like a csv and a database table, both are streamed through a hash join in python where only
+    the build_side table is held in memory
+    :param tbl1: The name of table 1, a path to a .csv, or an iterable of dictionaries; String or Iterable
+    :param col1: The name of table 1 column to join on; String
+    :param tbl2: The name of table 2, a path to a .csv, or an iterable of dictionaries; String or Iterable
+    :param col2: The name of table 2 column to join with; String
+    :param join_type: The type of join. Either 'inner', 'right outer', 'left outer', 'full outer', 'cross', or
+                      'natural'; String
+    :param o_cursor: The cursor for the database tables; Cursor Class
+    :param columns: The columns to return, all columns if None. In the database use 't1.COL' and 't2.COL'; List
+    :param where: In the database, the WHERE clause as a string. For the python join, a function that takes the joined
+                  row dictionary and returns True to keep it; String or Function
+    :param binds: Values for the bind variables in where, database join only; Dict or List
+    :param fetch_mode: How the database results are returned, see run_oracle_query(); String
+    :param arraysize: Number of rows fetched from the database at a time; Int
+    :param build_side: For the python join, 'left' or 'right', the smaller table which is held in memory; String
+    :return: A joined table. The database join returns what run_oracle_query() returns for the fetch_mode, the python
+             join returns a generator of dictionaries
+    '''
+    def in_database(tbl):
+        return isinstance(tbl, str) and not tbl.lower().endswith('.csv')
+
+    # Push the whole join down to the database
+    if o_cursor is not None and in_database(tbl1) and in_database(tbl2):
+        query = build_join_query(tbl1, col1, tbl2, col2, join_type, columns, where)
+        return run_oracle_query(query, o_cursor, binds=binds, fetch_mode=fetch_mode, arraysize=arraysize)
+
+    # Stream the tables through a hash join. The build side is read all the way before the probe side starts, so
+    # both can be read with the same cursor
+    joined_rows = hash_join(iterate_source(tbl1, o_cursor, arraysize), col1, iterate_source(tbl2, o_cursor, arraysize),
+                            col2, join_type, build_side)
+    if callable(where):
+        joined_rows = (row for row in joined_rows if where(row))
+    if columns:
+        joined_rows = ({col: row.get(col) for col in columns} for row in joined_rows)
+    return joined_rows
+
+
+########################################################################################################################
+# Streaming ASCII file clean up, dedup and sort
+########################################################################################################################
+def clean_ascii_lines(file_in, prefix_length=34):
+    '''
+    Reads an ASCII export one line at a time and removes the floating point X and Y values that are forcibly written
+    into the left-most bytes of each line and the decimal places appended to integer values. Blank lines are skipped
+    :param file_in: The ASCII file from the Export Feature Attribute to ASCII script tool; String
+    :param prefix_length: Number of characters of X and Y values at the start of each line; Int
+    :return: A generator of the cleaned lines, each ending with a new line
+    '''
+    with open(file_in) as f:
+        for line in f:
+            line = line.rstrip('\n')[prefix_length:].replace(".000000", "")
+            if line:
+                yield line + '\n'
+
+
+def _write_sorted_run(lines, temp_dir):
+    '''
+    Sorts a list of lines and writes it to a temporary file for external_sort()
+    :return: The path of the temporary file
+    '''
+    lines.sort()
+    handle, run_path = tempfile.mkstemp(suffix='.run', dir=temp_dir, text=True)
+    with os.fdopen(handle, 'w') as run_file:
+        run_file.writelines(lines)
+    return run_path
+
+
+def _drop_adjacent_duplicates(sorted_lines):
+    '''
+    Yields each line of a sorted iterable once
     '''
-    pass
+    previous = None
+    for line in sorted_lines:
+        if line != previous:
+            yield line
+            previous = line
+
+
+def external_sort(lines, file_out, max_lines_in_memory=1000000, temp_dir=None, unique=False):
+    '''
+    Sorts lines into a file while holding at most max_lines_in_memory lines in memory. Lines are sorted in runs that
+    are written to temporary files, then the runs are merged into the output file
+    :param lines: Iterable of lines, each ending with a new line; Iterable
+    :param file_out: The file to write the sorted lines to; String
+    :param max_lines_in_memory: Max number of lines in a sorted run; Int
+    :param temp_dir: Folder for the temporary run files, defaults to the system temp folder; String
+    :param unique: If True duplicate lines are written once, they are dropped while merging; Bool
+    :return: The number of lines written
+    '''
+    run_paths = []
+    buffer = []
+    line_count = 0
+
+    def write_lines(outfile, sorted_lines):
+        nonlocal line_count
+        if unique:
+            sorted_lines = _drop_adjacent_duplicates(sorted_lines)
+        for line in sorted_lines:
+            outfile.write(line)
+            line_count += 1
+
+    try:
+        for line in lines:
+            buffer.append(line)
+            if len(buffer) >= max_lines_in_memory:
+                run_paths.append(_write_sorted_run(buffer, temp_dir))
+                buffer = []
+
+        with open(file_out, "w") as outfile:
+            if not run_paths:  # Everything fit in memory
+                buffer.sort()
+                write_lines(outfile, buffer)
+            else:
+                if buffer:
+                    run_paths.append(_write_sorted_run(buffer, temp_dir))
+                    buffer = []
+                run_files = [open(run_path) for run_path in run_paths]
+                try:
+                    write_lines(outfile, heapq.merge(*run_files))
+                finally:
+                    for run_file in run_files:
+                        run_file.close()
+    finally:
+        for run_path in run_paths:
+            os.remove(run_path)
+    return line_count
+
+
+def finalize_ascii(file_in, file_unq, file_out, prefix_length=34, max_lines_in_memory=1000000, temp_dir=None):
+    '''
+    Finalizes an ASCII export in one streaming pass: the X and Y values and the decimal places are removed, duplicate
+    rows are dropped and the unique rows are written to file_unq in their original order. Only a 16 byte digest of each
+    unique row is kept in memory for that. The rows are also sorted with a bounded memory external sort into file_out,
+    which drops the duplicates while merging. The input file is not changed
+    :param file_in: The ASCII file from the Export Feature Attribute to ASCII script tool; String
+    :param file_unq: Output file for the unique rows; String
+    :param file_out: Output file for the sorted unique rows; String
+    :param prefix_length: Number of characters of X and Y values at the start of each line; Int
+    :param max_lines_in_memory: Max number of lines held in memory while sorting; Int
+    :param temp_dir: Folder for the temporary sort files, defaults to the system temp folder; String
+    :return: Number of rows read and number of unique rows
+    '''
+    seen = set()
+    row_count = 0
+
+    def all_lines(unq_file):
+        nonlocal row_count
+        for line in clean_ascii_lines(file_in, prefix_length):
+            row_count += 1
+            digest = hashlib.blake2b(line.encode(), digest_size=16).digest()
+            if digest not in seen:
+                seen.add(digest)
+                unq_file.write(line)
+            yield line
+
+    with open(file_unq, "w") as unq_file:
+        unique_count = external_sort(all_lines(unq_file), file_out, max_lines_in_memory, temp_dir, unique=True)
+    return row_count, unique_count
+
+
+########################################################################################################################
+# Bulk load rows into a table
+########################################################################################################################
+def parse_ascii_rows(file_path, delimiter=',', quotechar='"'):
+    '''
+    Reads a delimited text file one row at a time. Empty values are returned as None so they load as NULL
+    :param file_path: The delimited file, like the .txt made by finalize_ascii(); String
+    :param delimiter: The character between the values; String
+    :param quotechar: The character used to quote values; String
+    :return: A generator of the rows as tuples
+    '''
+    with open(file_path, newline='') as f:
+        for row in csv.reader(f, delimiter=delimiter, quotechar=quotechar):
+            if row:
+                yield tuple(value if value != '' else None for value in row)
+
+
+def _bind_placeholders(db, count):
+    '''
+    Makes the bind placeholders for an insert based on the paramstyle of the driver the connection came from
+    :param db: A DB-API connection; Connection Class
+    :param count: Number of values; Int
+    :return: The placeholders separated by commas
+    '''
+    driver = sys.modules.get(type(db).__module__.split('.')[0])
+    paramstyle = getattr(driver, 'paramstyle', 'qmark')
+    if paramstyle in ('named', 'numeric'):  # Oracle binds :1, :2... by position
+        return ', '.join(f':{i}' for i in range(1, count + 1))
+    elif paramstyle in ('format', 'pyformat'):
+        return ', '.join(['%s'] * count)
+    return ', '.join(['?'] * count)
+
+
+def bulk_load(rows, table, columns, db, batch_size=10000, commit_every=10, print_statement=True):
+    '''
+    Loads rows into a table with executemany array binding. Works with any DB-API connection (cx_Oracle, sqlite3...)
+    :param rows: Iterable of rows, each a sequence of values in the order of columns; Iterable
+    :param table: The table to insert into; String
+    :param columns: The columns of the table the values go into; List
+    :param db: The database connection; Connection Class
+    :param batch_size: Number of rows sent in a single executemany call; Int
+    :param commit_every: Commit after this many batches; Int
+    :param print_statement: If true, prints the number of rows loaded and the rows per second; Bool
+    :return: The number of rows loaded and the rows per second
+    '''
+    insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({_bind_placeholders(db, len(columns))})"
+    cursor = db.cursor()
+    start = time.perf_counter()
+    row_count = 0
+    batch_count = 0
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(insert, batch)
+                row_count += len(batch)
+                batch = []
+                batch_count += 1
+                if batch_count % commit_every == 0:
+                    db.commit()
+        if batch:
+            cursor.executemany(insert, batch)
+            row_count += len(batch)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    elapsed = time.perf_counter() - start
+    rows_per_second = row_count / elapsed if elapsed > 0 else float(row_count)
+    if print_statement:
+        print(f'{row_count} rows loaded into {table} in {elapsed:.2f} seconds ({rows_per_second:.0f} rows per second)')
+    return row_count, rows_per_second
 
 
 ########################################################################################################################
 # ASCII to Oracle Function from custom script in toolbox
 ########################################################################################################################
-def ASCIIToOracle(fileAscii, dbInstance="prod"):
+def ASCIIToOracle(fileAscii, dbInstance="prod", db=None, table=None, columns=None, delimiter=',', batch_size=10000):
     # Script Name: load_ascii_to_oracle.py
     #
     # Description: Replaces load_dbf_to_oracle.aml.  Input to this script tool is
     #              an ASCII file produced by the Export Feature Attribute to ASCII
-    #              script tool.  This script finalizes the file, sorts it, and runs
-    #              a .bat script which loads the data into Oracle using SQL*Loader.
+    #              script tool.  This script finalizes the file, sorts it, and
+    #              loads the data into Oracle. If a connection (db), table and
+    #              columns are given the rows are bulk loaded with bulk_load(),
+    #              otherwise it runs a .bat script which loads the data into
+    #              Oracle using SQL*Loader.
     #
     #              The arcgisscripting module is not needed in this Python script,
     #              because all the tasks performed here are non-GIS tasks.
@@ -117,67 +758,42 @@ def ASCIIToOracle(fileAscii, dbInstance="prod"):
         # Remove the floating point X and Y values that are forcibly written into
         # the left-most 34 bytes of each line by the Export Feature Attribute to
         # ASCII script (in that script tool, there is no option NOT to include the
-        # X and Y values)
-
-        for line in fileinput.input(fileIn, inplace=True):
-            string = line
-            line = line.replace(string, string[34:])
-            sys.stdout.write(line)
-        fileinput.close()
-
-        print("Just removed the X and Y values...now removing the decimal places...")
-
-        # Remove the decimal places that are appended to integer values
-        # by the Export Feature Attribute to ASCII script (in that script tool,
-        # there is no option to say "please don't add decimal places to my
-        # integers")
-
-        for line in fileinput.input(fileIn, inplace=True):
-            line = line.replace(".000000", "")
-            sys.stdout.write(line)
-        fileinput.close()
-
-        print("Just removed the decimal places...now removing duplicates...")
-
-        # Remove duplicate rows from the file
-
-        rows = open(fileIn).read().split("\n")
-        newrows = []
-        for row in rows:
-            if row not in newrows:
-                newrows.append(row)
+        # X and Y values), remove the decimal places that are appended to integer
+        # values, remove duplicate rows and sort the file. This is all done while
+        # streaming the file so large exports don't have to fit in memory
 
-        f = open(fileUnq, "w")
-        f.write("\n".join(newrows))
-        f.close()
+        row_count, unique_count = finalize_ascii(fileIn, fileUnq, fileOut)
 
-        print("Just removed duplicate rows...starting the sort...")
+        print(f"Just removed the X and Y values, decimal places and {row_count - unique_count} duplicate rows...")
 
-        # Sort the file
+        if db is not None:
+            print("Just completed the sort...bulk loading the rows...")
 
-        outfile = open(fileOut, "w")
-        # Code origionally used file() which is the python 2 version of open()
-        outfile.writelines(sorted(open(fileUnq, "r").readlines()))
-        outfile.close()
+            # Stream the sorted rows straight into the table
+            row_count, rows_per_second = bulk_load(parse_ascii_rows(fileOut, delimiter), table, columns, db,
+                                                   batch_size=batch_size)
 
-        print("Just completed the sort...calling the SQL*Loader script...")
+            timeNow = datetime.time(datetime.now())
+            print("Bulk load completed at " + str(timeNow) + "...you are done")
+        else:
+            print("Just completed the sort...calling the SQL*Loader script...")
 
-        # Run the .bat file which runs the SQL*Loader command
+            # Run the .bat file which runs the SQL*Loader command
 
-        shutil.copyfile(fileOut, os.path.join(Processing_Tool_dir_path, os.path.basename(fileOut)))
-        shutil.copyfile(fileUnq, os.path.join(Processing_Tool_dir_path, os.path.basename(fileUnq)))
+            shutil.copyfile(fileOut, os.path.join(Processing_Tool_dir_path, os.path.basename(fileOut)))
+            shutil.copyfile(fileUnq, os.path.join(Processing_Tool_dir_path, os.path.basename(fileUnq)))
 
-        # Run the .bat file which runs the SQL*Loader command (Does not use the newly generated files)
-        ####################################################################
-        # NOTE: '.ctl' files located in 'C:\\MyData\\City\\DSD\\PTS\\parcels\\scripts' have been updated to point to new Parcel Processing Folder.
-        ####################################################################
-        os.system(pathPTS + "/load_ascii_to_oracle.bat prod " + fileAsciiBasename + " > " + Work_Tool_data_dir_path + "/load_ascii_to_oracle_" + fileAsciiBasename + ".log")
+            # Run the .bat file which runs the SQL*Loader command (Does not use the newly generated files)
+            ####################################################################
+            # NOTE: '.ctl' files located in 'C:\\MyData\\City\\DSD\\PTS\\parcels\\scripts' have been updated to point to new Parcel Processing Folder.
+            ####################################################################
+            os.system(pathPTS + "/load_ascii_to_oracle.bat prod " + fileAsciiBasename + " > " + Work_Tool_data_dir_path + "/load_ascii_to_oracle_" + fileAsciiBasename + ".log")
 
-        #os.system(pathPTS + "/load_ascii_to_oracle.bat " + dbInstance + " " + fileAsciiBasename + " > " + pathPTS + "/load_ascii_to_oracle_" + fileAsciiBasename + ".log")
+            #os.system(pathPTS + "/load_ascii_to_oracle.bat " + dbInstance + " " + fileAsciiBasename + " > " + pathPTS + "/load_ascii_to_oracle_" + fileAsciiBasename + ".log")
 
-        timeNow = datetime.time(datetime.now())
-        print("SQL*Loader script completed at " + str(timeNow) + "...you are done")
-        print(Work_Tool_data_dir_path + "/load_ascii_to_oracle_" + fileAsciiBasename + ".log")
+            timeNow = datetime.time(datetime.now())
+            print("SQL*Loader script completed at " + str(timeNow) + "...you are done")
+            print(Work_Tool_data_dir_path + "/load_ascii_to_oracle_" + fileAsciiBasename + ".log")
         # Uncomment this line to see the execution in the command window
         input("Press ENTER to continue...")
     except Exception as e:
@@ -2,13 +2,369 @@
 import arcpy
 import pandas as pd
 import os
+import time
+
+
+# Field types from ListFields to the pandas dtype the csv ids are read as, so they match the values in the fc
+ID_DTYPES = {'SmallInteger': 'Int64', 'Integer': 'Int64', 'BigInteger': 'Int64', 'OID': 'Int64', 'Single': 'float64',
+             'Double': 'float64', 'String': str, 'GUID': str, 'GlobalID': str}
+
+
+def read_csv_index(csv_file, idfield_read, read_fields, id_type=None):
+    """
+    Reads the csv in bulk with pandas and makes a dictionary to look up the new values of a record by its id. Rows
+    without an id are dropped since they can't match a record
+    :param csv_file: csv file path for the new data to be updated; STRING
+    :param idfield_read: Name of the Foreign Key that will connect the proper records of the csv to the fc; STRING
+    :param read_fields: Names of the fields that contain the new data from the csv; LIST
+    :param id_type: Type of the id field in the fc from ListFields, EX: 'Integer'. The ids are read as that type, so
+                    an integer id is not read as 1.0 and a text id is not read as a number. None lets pandas guess;
+                    STRING
+    :return: Dictionary where the key is the id and the value is a tuple of the new values in read_fields order; DICT
+    """
+    dtype = {idfield_read: ID_DTYPES[id_type]} if id_type in ID_DTYPES else None
+    df = pd.read_csv(csv_file, usecols=[idfield_read] + list(read_fields), dtype=dtype)
+    df = df.dropna(subset=[idfield_read])
+    df = df.drop_duplicates(subset=idfield_read, keep='last')  # Same as the dict comprehension, the last record wins
+    # Turn NaN into None so it is written as null
+    columns = [df[fld].astype(object).where(df[fld].notna(), None).tolist() for fld in read_fields]
+    return dict(zip(df[idfield_read].tolist(), zip(*columns)))
+
+
+def update_rows(fc_path, index, idfield_update, write_fields, where_clauses=(None,)):
+    """
+    Updates the write fields of every row that is in the index in a single update cursor pass. Rows whose values are
+    already the same are not written. Has to be called inside of an edit session for versioned data
+    :param fc_path: Path of the Feature Class to update; STRING
+    :param index: Dictionary from read_csv_index(); DICT
+    :param idfield_update: Name of the Primary Key that will connect the proper records of the fc to the csv; STRING
+    :param write_fields: Names of the fields that will be updated, same order as the index values; LIST
+    :param where_clauses: Where clauses from FC._plan_where_clauses(), one cursor is opened for each. None opens the
+                          cursor on the whole table; LIST
+    :return: number of rows updated; INT
+    """
+    update_count = 0
+    for where_clause in where_clauses:
+        with arcpy.da.UpdateCursor(fc_path, [idfield_update] + list(write_fields), where_clause) as cursor:
+            for row in cursor:  # For each row in table
+                new_values = index.get(row[0])  # Check if this rows idfield_update is in the csv
+                if new_values is not None and tuple(row[1:]) != new_values:  # Only write if something changed
+                    cursor.updateRow([row[0]] + list(new_values))  # "Save" the update
+                    update_count += 1
+    return update_count
+
+
+def build_where_clauses(field, values, chunk_size=1000):
+    """
+    Makes a list of where clauses that select the values with IN lists, split into chunks so no list is longer than
+    chunk_size (Oracle allows at most 1000)
+    :param field: The field name, already delimited for the workspace; STRING
+    :param values: The values to select; LIST
+    :param chunk_size: Max number of values in a single IN list; INT
+    :return: list of where clauses; LIST
+    """
+    sql_values = []
+    for value in values:
+        if value is None or pd.isna(value):  # A null or NaN can't match with IN
+            continue
+        if isinstance(value, str):
+            sql_values.append("'" + value.replace("'", "''") + "'")
+        else:
+            sql_values.append(str(value))
+    return [f"{field} IN ({','.join(sql_values[i:i + chunk_size])})" for i in range(0, len(sql_values), chunk_size)]
+
+
+# Field types from ListFields to the field types used by AddField
+ADD_FIELD_TYPES = {'String': 'TEXT', 'SmallInteger': 'SHORT', 'Integer': 'LONG', 'BigInteger': 'BIGINTEGER',
+                   'Single': 'FLOAT', 'Double': 'DOUBLE', 'Date': 'DATE', 'GUID': 'GUID', 'GlobalID': 'GUID',
+                   'OID': 'LONG'}
+
+
+# Metadata for each feature class path, shared by every FC that points at the same path
+_metadata_cache = {}
+
+
+class FCMetadata:
+    """
+    Caches the Describe, fields, domains, versioning flag and count of a feature class so the geodatabase is only asked
+    once. Each piece is loaded the first time it is used. Use get_metadata() to get the shared instance for a path
+    """
+    def __init__(self, path):
+        self.path = path
+        self._describe = None
+        self._fields = None
+        self._count = None
+
+    @property
+    def describe(self):
+        """The arcpy Describe object"""
+        if self._describe is None:
+            self._describe = arcpy.Describe(self.path)
+        return self._describe
+
+    @property
+    def fields(self):
+        """List of arcpy Field objects"""
+        if self._fields is None:
+            self._fields = arcpy.ListFields(self.path)
+        return self._fields
+
+    @property
+    def field_types(self):
+        """Dictionary of field name to field type"""
+        return {field.name: field.type for field in self.fields}
+
+    @property
+    def domains(self):
+        """Dictionary of field name to domain name for the fields that have a domain"""
+        return {field.name: field.domain for field in self.fields if field.domain}
+
+    @property
+    def is_versioned(self):
+        """True if the feature class is versioned"""
+        return self.describe.isVersioned
+
+    @property
+    def count(self):
+        """Number of features"""
+        if self._count is None:
+            self._count = int(arcpy.management.GetCount(self.path)[0])
+        return self._count
+
+    def get_field(self, field_name):
+        """
+        Finds a field by name, not case sensitive
+        :param field_name: Name of the field; STRING
+        :return: the arcpy Field object or None if it does not exist
+        """
+        for field in self.fields:
+            if field.name.lower() == field_name.lower():
+                return field
+        return None
+
+    def invalidate_schema(self):
+        """Drops the cached Describe and fields so they are read again, used after a schema change"""
+        self._describe = None
+        self._fields = None
+
+    def refresh_count(self):
+        """Drops the cached count so the features are counted again"""
+        self._count = None
+
+    def refresh(self):
+        """Drops everything that is cached so it is read again"""
+        self.invalidate_schema()
+        self.refresh_count()
+
+
+def get_metadata(path):
+    """
+    Gets the cached metadata for a feature class, the same object is returned for the same path
+    :param path: path to a feature class; STRING
+    :return: FCMetadata
+    """
+    key = os.path.normcase(os.path.normpath(path))
+    if key not in _metadata_cache:
+        _metadata_cache[key] = FCMetadata(path)
+    return _metadata_cache[key]
+
+
+def get_field_type(path, field_name):
+    """
+    Gets the type of a field from the cached metadata, the name is matched without case
+    :param path: path to a feature class; STRING
+    :param field_name: name of the field; STRING
+    :return: field type from ListFields, EX: 'Integer', None if the field is not found; STRING
+    """
+    for field in get_metadata(path).fields:
+        if field.name.lower() == field_name.lower():
+            return field.type
+    return None
+
+
+class SchemaChangePlan:
+    """
+    Collects schema changes for a feature class, checks them against the cached fields and runs them with the fewest
+    geoprocessing calls: all new fields go in one AddFields call (with their domains and defaults), all dropped fields
+    go in one DeleteField call. Get one from FC.plan_schema_changes()
+    """
+    def __init__(self, fc):
+        self.fc = fc
+        self.adds = []  # [name, type, alias, length, default, domain], the AddFields field description order
+        self.drops = []  # field names
+        self.alters = []  # [name, new name, new alias, new length]
+        self.domains = []  # [field name, domain name]
+        self.defaults = []  # [field name, default value]
+
+    def add_field(self, name, field_type, alias='', length=None, default=None, domain=''):
+        """Adds a new field. field_type is an AddField type like TEXT, SHORT, LONG, DOUBLE or DATE"""
+        self.adds.append([name, field_type, alias, length, default, domain])
+        return self
+
+    def drop_field(self, name):
+        """Deletes a field"""
+        self.drops.append(name)
+        return self
+
+    def alter_field(self, name, new_name=None, new_alias=None, length=None):
+        """Changes the name, alias or length of a field"""
+        self.alters.append([name, new_name, new_alias, length])
+        return self
+
+    def assign_domain(self, name, domain):
+        """Assigns a domain to a field"""
+        self.domains.append([name, domain])
+        return self
+
+    def assign_default(self, name, default):
+        """Assigns a default value to a field"""
+        self.defaults.append([name, default])
+        return self
+
+    def validate(self):
+        """
+        Checks the changes against the fields of the feature class in the order they run: drops, alters, adds, domains,
+        defaults. Alters must use the name the field has at that point, and domains and defaults of a renamed field
+        must use its new name. Conflicting changes to the same field are rejected
+        :return: list of problems, empty if the plan can run; LIST
+        """
+        problems = []
+        # Field names as they will be while the steps run
+        names = {field.name.lower(): field for field in self.fc.metadata.fields}
+        dropped = set()
+        renamed = {}  # old name to new name
+        added = set()
+
+        for name in self.drops:
+            field = names.get(name.lower())
+            if name.lower() in dropped:
+                problems.append(f'Cannot drop {name} twice')
+            elif field is None:
+                problems.append(f'Cannot drop {name}, the field does not exist')
+            elif field.required:
+                problems.append(f'Cannot drop {name}, the field is required')
+            else:
+                del names[name.lower()]
+                dropped.add(name.lower())
+
+        for name, new_name, new_alias, length in self.alters:
+            if name.lower() in dropped:
+                problems.append(f'Cannot alter {name}, it is dropped in the same plan')
+                continue
+            if name.lower() in renamed:
+                problems.append(f'Cannot alter {name}, it was renamed to {renamed[name.lower()]}')
+                continue
+            field = names.get(name.lower())
+            if field is None:
+                problems.append(f'Cannot alter {name}, the field does not exist')
+                continue
+            if new_name and new_name.lower() != name.lower():
+                if new_name.lower() in names:
+                    problems.append(f'Cannot rename {name} to {new_name}, the field already exists')
+                    continue
+                del names[name.lower()]
+                names[new_name.lower()] = field
+                renamed[name.lower()] = new_name
+
+        for add in self.adds:
+            if add[0].lower() in dropped:
+                problems.append(f'Cannot add {add[0]}, it is dropped in the same plan')
+            elif add[0].lower() in names or add[0].lower() in added:
+                problems.append(f'Cannot add {add[0]}, the field already exists')
+            added.add(add[0].lower())
+
+        for kind, assignments in [['domain', self.domains], ['default', self.defaults]]:
+            assigned = set()
+            for name, value in assignments:
+                if name.lower() in assigned:
+                    problems.append(f'Cannot assign two {kind}s to {name}')
+                elif name.lower() in dropped:
+                    problems.append(f'Cannot assign {value} to {name}, it is dropped in the same plan')
+                elif name.lower() in renamed:
+                    problems.append(f'Cannot assign {value} to {name}, it was renamed to {renamed[name.lower()]}')
+                elif name.lower() not in names and name.lower() not in added:
+                    problems.append(f'Cannot assign {value} to {name}, the field does not exist')
+                assigned.add(name.lower())
+        return problems
+
+    def steps(self):
+        """
+        Merges the changes into the fewest geoprocessing calls, in the order drops, alters, adds, domains, defaults
+        :return: list of [description, tool, keyword arguments]; LIST
+        """
+        path = self.fc.path
+        adds = {add[0].lower(): list(add) for add in self.adds}
+        drops = list(self.drops)
+        # Domains and defaults for new fields go in the AddFields call
+        domains = []
+        for name, domain in self.domains:
+            if name.lower() in adds:
+                adds[name.lower()][5] = domain
+            else:
+                domains.append([name, domain])
+        defaults = []
+        for name, default in self.defaults:
+            if name.lower() in adds:
+                adds[name.lower()][4] = default
+            else:
+                defaults.append([name, default])
+
+        step_list = []
+        if drops:
+            step_list.append([f'DeleteField {", ".join(drops)}', arcpy.management.DeleteField,
+                              {'in_table': path, 'drop_field': drops}])
+        for name, new_name, new_alias, length in self.alters:
+            kwargs = {'in_table': path, 'field': name}
+            if new_name:
+                kwargs['new_field_name'] = new_name
+            if new_alias:
+                kwargs['new_field_alias'] = new_alias
+            if length:
+                kwargs['field_length'] = length
+            step_list.append([f'AlterField {name}', arcpy.management.AlterField, kwargs])
+        if adds:
+            descriptions = [['' if value is None else value for value in add] for add in adds.values()]
+            step_list.append([f'AddFields {", ".join(add[0] for add in descriptions)}', arcpy.management.AddFields,
+                              {'in_table': path, 'field_description': descriptions}])
+        for name, domain in domains:
+            step_list.append([f'AssignDomainToField {name}', arcpy.management.AssignDomainToField,
+                              {'in_table': path, 'field_name': name, 'domain_name': domain}])
+        for name, default in defaults:
+            step_list.append([f'AssignDefaultToField {name}', arcpy.management.AssignDefaultToField,
+                              {'in_table': path, 'field_name': name, 'default_value': default}])
+        return step_list
+
+    def execute(self):
+        """
+        Validates the plan, makes sure the schema lock can be taken once up front, then runs the merged steps
+        :return: list of [description, seconds] for each step; LIST
+        """
+        problems = self.validate()
+        if problems:
+            raise ValueError('The schema change plan is not valid: ' + '; '.join(problems))
+        steps = self.steps()
+        if not steps:
+            return []
+        if not arcpy.TestSchemaLock(self.fc.path):
+            raise RuntimeError(f'Cannot get a schema lock on {self.fc.path}')
+
+        timings = []
+        try:
+            for description, tool, kwargs in steps:
+                start = time.perf_counter()
+                tool(**kwargs)
+                timings.append([description, time.perf_counter() - start])
+                print(f'{description} took {timings[-1][1]:.2f} seconds')
+        finally:
+            self.fc.metadata.invalidate_schema()
+        return timings
 
 
 # Create a class that represents a feature class
 class FC:
     def __init__(self, path):
         self.path = path
-        self.describe = arcpy.Describe(path)
+        self.metadata = get_metadata(path)
         self.name = self.describe.name
         self.spatial_reference = self.describe.spatialReference
         self.shape_type = self.describe.shapeType
@@ -21,15 +377,29 @@ class FC:
     #  Schema Understanding Methods
     # ===============================================================
 
-    def get_feature_count(self):
-        """Returns the number of features in the feature class."""
-        return arcpy.management.GetCount(self.path)[0]
+    @property
+    def describe(self):
+        """The cached arcpy Describe object of the feature class."""
+        return self.metadata.describe
+
+    def refresh_metadata(self):
+        """Reads the Describe, fields and count again the next time they are used."""
+        self.metadata.refresh()
+
+    def get_feature_count(self, use_cache=False):
+        """Returns the number of features in the feature class.
+        param use_cache: True to use the last count instead of counting again, it is not updated by loads or deletes;
+                         Bool
+        """
+        if not use_cache:
+            self.metadata.refresh_count()
+        return self.metadata.count
 
     def list_fields(self, include_type=False):
         """Returns a list of field names and types in the feature class.
         param include_type: True gives name and type, False is just name; Bool
         """
-        fields = arcpy.ListFields(self.path)
+        fields = self.metadata.fields
         if include_type:
             ret_list = []
             for field in fields:
@@ -48,7 +418,7 @@ class FC:
                      defaultValue, domain, editable, isNullable, length, precision, required, type; STRING
         :return: report DF if no output location is chosen
         """
-        fields = arcpy.ListFields(self.path)
+        fields = self.metadata.fields
         field_list = []
         cols = []
         for arg in args:
@@ -98,7 +468,7 @@ class FC:
         Checks if a feature class is versioned
         :return: True if versioned and False if not versioned
         """
-        dataset_versioned = arcpy.Describe(fc_path).isVersioned
+        dataset_versioned = self.metadata.is_versioned
         return dataset_versioned
 
     def list_versions(self):
@@ -164,10 +534,12 @@ class FC:
                                       field_precision=length, field_alias=field_alias,
                                       field_is_nullable=field_is_nullable, field_is_required=field_is_required,
                                       field_domain=field_domain)
+        get_metadata(in_table).invalidate_schema()
 
     def remove_field(self, field_list):
-        for field in field_list:
-            arcpy.management.DeleteField(in_table=self.path, drop_field=field)
+        # Drop all the fields in one call so the schema lock is only taken once
+        arcpy.management.DeleteField(in_table=self.path, drop_field=list(field_list))
+        self.metadata.invalidate_schema()
         print(f'Fields dropped for {self.path}')
 
     def alter_fields(self, k, alter_list):
@@ -190,78 +562,170 @@ class FC:
                                         field_length=alter_list[3])
         elif k == 'Length':
             arcpy.management.AlterField(in_table=self.path, field=alter_list[0], field_length=alter_list[3])
+        self.metadata.invalidate_schema()
 
     def add_domain(self, k, domain_list):
         if k == 'Domain':
             arcpy.management.AssignDomainToField(in_table=self.path, field_name=domain_list[0],
                                                  domain_name=domain_list[1])
+            self.metadata.invalidate_schema()
 
     def add_default_value(self, k, default_list):
         if k == 'Default Value':
             arcpy.management.AssignDefaultToField(in_table=self.path, field_name=default_list[0],
                                                   default_value=default_list[1])
+            self.metadata.invalidate_schema()
+
+    def plan_schema_changes(self):
+        """
+        Starts a plan to batch schema changes, EX:
+        'fc.plan_schema_changes().drop_field('OLD').add_field('NEW', 'TEXT', length=50).execute()'
+        :return: SchemaChangePlan
+        """
+        return SchemaChangePlan(self)
 
     def batch_modify_fields(self, alter_dict):
         """
-        Alters fields based on the given dictionary of key as how to update and value as the update list
-        :param alter_dict: in the format of key is how to update and value is the update list.
-                           Key options: 'Only Alias', 'Name and Alias', 'Only Name', 'Alias and Length', 'Length'
+        Alters fields based on the given dictionary of key as how to update and value as the update list. The changes
+        are validated and merged into as few geoprocessing calls as possible
+        :param alter_dict: in the format of key is how to update and value is the update list, or a list of update lists.
+                           Key options: 'Only Alias', 'Name and Alias', 'Only Name', 'Alias and Length', 'Length',
+                           'Domain', 'Default Value'
                            Value list format: if to change fields: [current name, new name, new alias, new length]
-                           If to add a domain
-        :return:
+                           If to add a domain: [field name, domain name]
+                           If to add a default value: [field name, default value]
+        :return: list of [description, seconds] for each geoprocessing call
         """
-        # Apply the methods
-        for key, val in alter_dict:
-            alter_fields(key, val)
-            add_domain(key, val)
-            add_default_value(key, val)
+        plan = self.plan_schema_changes()
+        for key, val in alter_dict.items():
+            # Allow a single update list or a list of them
+            val_list = val if val and isinstance(val[0], (list, tuple)) else [val]
+            for alter_list in val_list:
+                if key == 'Only Alias':
+                    plan.alter_field(alter_list[0], new_alias=alter_list[2])
+                elif key == 'Name and Alias':
+                    plan.alter_field(alter_list[0], new_name=alter_list[1], new_alias=alter_list[2])
+                elif key == 'Only Name':
+                    plan.alter_field(alter_list[0], new_name=alter_list[1])
+                elif key == 'Alias and Length':
+                    plan.alter_field(alter_list[0], new_alias=alter_list[2], length=alter_list[3])
+                elif key == 'Length':
+                    plan.alter_field(alter_list[0], length=alter_list[3])
+                elif key == 'Domain':
+                    plan.assign_domain(alter_list[0], alter_list[1])
+                elif key == 'Default Value':
+                    plan.assign_default(alter_list[0], alter_list[1])
+                else:
+                    print(f'{key} is not a valid key, skipping it')
+        # Apply the changes
+        return plan.execute()
 
     # ===============================================================
     #  Data Load Methods
     # ===============================================================
 
-    def load_data(self, csv_file, field_to_update, field_to_read, idfield_update, idfield_read):
+    def _get_workspace(self):
         """
-        Traditionally, how a data load would work is you would join the update table to the feature class on a PK-FK
-        connection. Then you would recalculate the target field from the FC to the update field from the update table.
-        How this works is it uses the update cursor to write fields from the csv to the fc. It is much faster than
-        joining the fields, calculating, and removing the join. Also avoids the pitfalls from dealing with versioned
-        data that cannot deal with schema changes easily.
+        Gets the workspace (the gdb, sde or folder) of the feature class, skipping over a feature dataset
+        :return: the workspace path
+        """
+        workspace = self.describe.path
+        if arcpy.Describe(workspace).dataType == 'FeatureDataset':
+            workspace = os.path.dirname(workspace)
+        return workspace
+
+    def _make_key_table(self, workspace, idfield_update, keys):
+        """
+        Makes a table in the workspace with an indexed KEY_ID field holding the keys, so they can be used in a sub query
+        :param workspace: The workspace of the feature class; STRING
+        :param idfield_update: Name of the field the keys are from, used to get the field type; STRING
+        :param keys: The key values; LIST
+        :return: path to the table
+        """
+        id_field = self.metadata.get_field(idfield_update)
+        key_table = arcpy.management.CreateTable(workspace, os.path.basename(
+            arcpy.CreateUniqueName('load_keys', workspace)))[0]
+        arcpy.management.AddField(key_table, 'KEY_ID', ADD_FIELD_TYPES.get(id_field.type, 'TEXT'),
+                                  field_length=id_field.length)
+        with arcpy.da.InsertCursor(key_table, ['KEY_ID']) as cursor:
+            for key in keys:
+                cursor.insertRow([key])
+        arcpy.management.AddIndex(key_table, ['KEY_ID'], 'load_keys_idx')
+        return key_table
+
+    def _plan_where_clauses(self, index, idfield_update, narrow='auto', max_ratio=0.1, max_in_lists=20):
+        """
+        Decides how the update cursor visits the rows. If the csv only has a small part of the table, the cursor is
+        narrowed with where clauses so only the candidate rows are read. A few thousand keys go into chunked IN lists,
+        more than that go into a temporary key table that is used in a sub query
+        :param index: Dictionary from read_csv_index(); DICT
+        :param idfield_update: Name of the Primary Key that will connect the proper records of the fc to the csv; STRING
+        :param narrow: 'auto' to decide from the csv row count compared to the feature count, True to always narrow,
+                       False to always scan the whole table; STRING or BOOL
+        :param max_ratio: For 'auto', the largest share of the table the csv can have and still be narrowed; FLOAT
+        :param max_in_lists: Max number of IN list chunks before a key table is used instead; INT
+        :return: list of where clauses (None is a full scan), path of the key table to delete after or None
+        """
+        if narrow is False or not index:
+            return [None], None
+        if narrow == 'auto':
+            # An estimate is enough to choose the plan
+            feature_count = self.get_feature_count(use_cache=True)
+            if feature_count == 0 or len(index) / feature_count > max_ratio:
+                return [None], None
+
+        id_sql = arcpy.AddFieldDelimiters(self.path, idfield_update)
+        where_clauses = build_where_clauses(id_sql, list(index))
+        if len(where_clauses) <= max_in_lists:
+            return where_clauses, None
+
+        # Too many keys for IN lists, put the keys in a table and use a sub query. Shapefiles can't do sub queries
+        workspace = self._get_workspace()
+        if arcpy.Describe(workspace).workspaceType == 'FileSystem':
+            return [None], None
+        key_table = self._make_key_table(workspace, idfield_update, list(index))
+        return [f'{id_sql} IN (SELECT KEY_ID FROM {arcpy.Describe(key_table).name})'], key_table
+
+    def load_fields(self, csv_file, field_map, idfield_update, idfield_read, narrow='auto'):
+        """
+        Loads several fields from a csv in one pass. The csv is read in bulk and every mapped field is updated in a
+        single update cursor pass, instead of one pass per field.
         :param csv_file: csv file path for the new data to be updated; STRING
-        :param field_to_update: Name of the field that will be updated in the feature class; STRING
-        :param field_to_read: Name of the field that contains the new data from the csv; STRING
+        :param field_map: Dictionary where the key is the csv field to read and the value is the fc field to update,
+                          EX: {'NEW_NAME': 'NAME', 'NEW_TYPE': 'TYPE'}; DICT
         :param idfield_update: Name of the Primary Key that will connect the proper records of the fc to the csv; STRING
         :param idfield_read: Name of the Foreign Key that will connect the proper records of the csv to the fc; STRING
-        :return:
+        :param narrow: 'auto' only reads the rows with an id in the csv when the csv is a small part of the table, True
+                       always does, False always reads the whole table; STRING or BOOL
+        :return: number of rows updated; INT
         """
+        key_table = None
         try:
-            # Create a dictionary for the field records that will be updated. The key is the id field and the value is
-            #  update field
-            d = {k: v for k, v in arcpy.da.SearchCursor(csv_file, [idfield_read, field_to_read])}
-            # Open the search cursor
-            with arcpy.da.UpdateCursor(self.path, [idfield_update, field_to_update]) as cursor:
-                for row in cursor:  # For each row in table
-                    if row[0] in d:  # Check if this rows idfield_update is in the dict that matches to idfield_read
-                        row[1] = d[row[0]]  # If so, update field_to_update to be field_to_read
-                        cursor.updateRow(row)  # "Save" the update
-                # print('Iterated through the rows')
+            read_fields = list(field_map)
+            index = read_csv_index(csv_file, idfield_read, read_fields, get_field_type(self.path, idfield_update))
+            where_clauses, key_table = self._plan_where_clauses(index, idfield_update, narrow)
+            update_count = update_rows(self.path, index, idfield_update, [field_map[fld] for fld in read_fields],
+                                       where_clauses)
+            print(f'{update_count} rows updated')
+            return update_count
 
         except Exception as e:
             print(f"Error: {str(e)}")
+        finally:
+            if key_table:
+                arcpy.management.Delete(key_table)
 
-    def load_data_versioned(self, csv_file, field_to_update, field_to_read, idfield_update, idfield_read):
+    def load_fields_versioned(self, csv_file, field_map, idfield_update, idfield_read, narrow='auto'):
         """
-        Traditionally, how a data load would work is you would join the update table to the feature class on a PK-FK
-        connection. Then you would recalculate the target field from the FC to the update field from the update table.
-        How this works is it uses the update cursor to write fields from the csv to the fc. It is much faster than
-        joining the fields, calculating, and removing the join. Also avoids the pitfalls from dealing with versioned
-        data that cannot deal with schema changes easily.
+        Same as load_fields() but inside an edit session so it works with versioned data
         :param csv_file: csv file path for the new data to be updated; STRING
-        :param field_to_update: Name of the field that will be updated in the feature class; STRING
-        :param field_to_read: Name of the field that contains the new data from the csv; STRING
+        :param field_map: Dictionary where the key is the csv field to read and the value is the fc field to update,
+                          EX: {'NEW_NAME': 'NAME', 'NEW_TYPE': 'TYPE'}; DICT
         :param idfield_update: Name of the Primary Key that will connect the proper records of the fc to the csv; STRING
         :param idfield_read: Name of the Foreign Key that will connect the proper records of the csv to the fc; STRING
-        :return:
+        :param narrow: 'auto' only reads the rows with an id in the csv when the csv is a small part of the table, True
+                       always does, False always reads the whole table; STRING or BOOL
+        :return: number of rows updated; INT
         """
 
         # Set the workspace for where the edit will take place
@@ -278,27 +742,64 @@ class FC:
 
         print(workspace)
         arcpy.env.workspace = workspace
+
+        # Read the csv and make any key table before editing starts since a table can't be made in an edit session
+        read_fields = list(field_map)
+        index = read_csv_index(csv_file, idfield_read, read_fields, get_field_type(self.path, idfield_update))
+        where_clauses, key_table = self._plan_where_clauses(index, idfield_update, narrow)
+
         edit = arcpy.da.Editor(workspace)  # Edit workspace
         edit.startEditing(False, True)  # args: with_undo, multiuser
 
         try:
             edit.startOperation()  # Start the editing
-            # Create a dictionary for the field records that will be updated. The key is the id field and the value is
-            #  update field
-            d = {k: v for k, v in arcpy.da.SearchCursor(csv_file, [idfield_read, field_to_read])}
-            # Open the search cursor
-            with arcpy.da.UpdateCursor(self.path, [idfield_update, field_to_update]) as cursor:
-                for row in cursor:  # For each row in table
-                    if row[0] in d:  # Check if this rows idfield_update is in the dict that matches to idfield_read
-                        row[1] = d[row[0]]  # If so, update field_to_update to be field_to_read
-                        cursor.updateRow(row)  # "Save" the update
-                # print('Iterated through the rows')
+            update_count = update_rows(self.path, index, idfield_update, [field_map[fld] for fld in read_fields],
+                                       where_clauses)
 
         except Exception as e:
             edit.abortOperation()
+            edit.stopEditing(save_changes=False)
+            print(f"Error: {str(e)}")
         else:
             edit.stopOperation()
             edit.stopEditing(save_changes=True)  # True to save edits, False to discard
+            print(f'{update_count} rows updated')
+            return update_count
+        finally:
+            if key_table:
+                arcpy.management.Delete(key_table)
+
+    def load_data(self, csv_file, field_to_update, field_to_read, idfield_update, idfield_read):
+        """
+        Traditionally, how a data load would work is you would join the update table to the feature class on a PK-FK
+        connection. Then you would recalculate the target field from the FC to the update field from the update table.
+        How this works is it uses the update cursor to write fields from the csv to the fc. It is much faster than
+        joining the fields, calculating, and removing the join. Also avoids the pitfalls from dealing with versioned
+        data that cannot deal with schema changes easily. To load several fields at once use load_fields().
+        :param csv_file: csv file path for the new data to be updated; STRING
+        :param field_to_update: Name of the field that will be updated in the feature class; STRING
+        :param field_to_read: Name of the field that contains the new data from the csv; STRING
+        :param idfield_update: Name of the Primary Key that will connect the proper records of the fc to the csv; STRING
+        :param idfield_read: Name of the Foreign Key that will connect the proper records of the csv to the fc; STRING
+        :return:
+        """
+        return self.load_fields(csv_file, {field_to_read: field_to_update}, idfield_update, idfield_read)
+
+    def load_data_versioned(self, csv_file, field_to_update, field_to_read, idfield_update, idfield_read):
+        """
+        Traditionally, how a data load would work is you would join the update table to the feature class on a PK-FK
+        connection. Then you would recalculate the target field from the FC to the update field from the update table.
+        How this works is it uses the update cursor to write fields from the csv to the fc. It is much faster than
+        joining the fields, calculating, and removing the join. Also avoids the pitfalls from dealing with versioned
+        data that cannot deal with schema changes easily. To load several fields at once use load_fields_versioned().
+        :param csv_file: csv file path for the new data to be updated; STRING
+        :param field_to_update: Name of the field that will be updated in the feature class; STRING
+        :param field_to_read: Name of the field that contains the new data from the csv; STRING
+        :param idfield_update: Name of the Primary Key that will connect the proper records of the fc to the csv; STRING
+        :param idfield_read: Name of the Foreign Key that will connect the proper records of the csv to the fc; STRING
+        :return:
+        """
+        return self.load_fields_versioned(csv_file, {field_to_read: field_to_update}, idfield_update, idfield_read)
 
 if __name__ == '__main__':
 
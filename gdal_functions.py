@@ -8,33 +8,173 @@ Y arcpy.management.Delete()
 Y arcpy.management.Copy()
 N arcpy.management.MakeFeatureLayer()
     - This is not necessary, I may drop this aspect at the risk of performance
-arcpy.management.SelectLayerByAttribute()
-    - I can think of a way to do this with pandas
+Y arcpy.management.SelectLayerByAttribute()
+    - select_features uses an OGR attribute filter and writes the selection in bulk
 Y arcpy.management.CopyFeatures()
     - Would be easy with geopandas
-    - Did a simple version with fiona
+    - copy_features uses select_features and OGR CopyLayer
 arcpy.in_workspace #I think this can be replaced with a set environ
-arcpy.management.AddSpatialIndex()
-arcpy.management.AddIndex()
+Y arcpy.management.AddSpatialIndex()
+    - add_spatial_index makes a .qix for shapefiles and an R-tree for GeoPackages
+Y arcpy.management.AddIndex()
+    - add_index makes attribute indexes with OGR SQL
 arcpy.ListFeatureClasses()
     - I can replace this by looking at the names
 Y arcpy.management.GetCount()
 M arcpy.da.UpdateCursor()
-arcpy.management.CalculateField()
-    - Geopandas can do this
-arcpy.management.Append()
+Y arcpy.management.CalculateField()
+    - calculate_field evaluates the expression over whole columns with geopandas
+Y arcpy.management.Append()
+    - append streams features in OGR transactions, or batches them through pyogrio
 '''
 
 #=======================================================================================================================
 # Imports
 #=======================================================================================================================
 from osgeo import ogr
+import importlib.util
+import numbers
 import os
+import re
+import numpy as np
 import pandas as pd
 import shutil
 import sys
-import fiona
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 import geopandas as gpd
+try:
+    import pyogrio
+except ImportError:
+    pyogrio = None
+#=======================================================================================================================
+# Datasource cache
+#=======================================================================================================================
+# Open OGR datasources keyed by (path, write, thread id). OGR handles must not be shared between threads, so each
+# thread gets its own handles. Each entry is [datasource, number of callers using it]. Only handles nobody is using are
+# closed or evicted, the least recently used first. Handles that are replaced or closed while in use are retired and
+# closed when their last caller releases them
+MAX_OPEN_DATASOURCES = 32
+_datasource_cache = OrderedDict()
+_retired_datasources = []  # [key, entry] of handles that are no longer handed out but are still in use
+_datasource_lock = threading.Lock()
+
+
+def _cache_path(in_shp):
+    return os.path.normcase(os.path.abspath(in_shp))
+
+
+def _close_datasource(key, entry):
+    # Write handles are flushed, the handle itself closes once the last reference to it is gone
+    if key[1]:
+        entry[0].FlushCache()
+
+
+def _drop_datasource(key):
+    # Closes a cached handle now if nobody is using it, otherwise retires it until it is released
+    entry = _datasource_cache.pop(key)
+    if entry[1] > 0:
+        _retired_datasources.append([key, entry])
+    else:
+        _close_datasource(key, entry)
+
+
+def _evict_datasources():
+    # Closes the least recently used handles that nobody is using until the cache is under its limit
+    for key in list(_datasource_cache):
+        if len(_datasource_cache) <= MAX_OPEN_DATASOURCES:
+            break
+        if _datasource_cache[key][1] == 0:
+            _close_datasource(key, _datasource_cache.pop(key))
+
+
+def open_datasource(in_shp, write=False, driver_name="ESRI Shapefile"):
+    """
+    Opens a datasource or reuses the cached one, call release_datasource when done with it. A write open retires the
+    read handles for the same path since they would not see the edits, and a read reuses a write handle of the same
+    thread
+    :param in_shp: File path; STRING
+    :param write: True if you want to write the file; BOOL
+    :param driver_name: driver name; STRING
+    :return: OGR datasource
+    """
+    path = _cache_path(in_shp)
+    thread_id = threading.get_ident()
+    keys = [(path, True, thread_id)] if write else [(path, False, thread_id), (path, True, thread_id)]
+    with _datasource_lock:
+        for key in keys:
+            if key in _datasource_cache:
+                _datasource_cache.move_to_end(key)
+                entry = _datasource_cache[key]
+                entry[1] += 1
+                return entry[0]
+        if write:
+            for key in [key for key in _datasource_cache if key[0] == path and not key[1]]:
+                _drop_datasource(key)
+        driver = ogr.GetDriverByName(driver_name)
+        data_source = driver.Open(in_shp, 1 if write else 0)
+        if data_source is None:
+            raise FileNotFoundError(f"Could not open {in_shp}")
+        _datasource_cache[(path, write, thread_id)] = [data_source, 1]
+        _evict_datasources()
+    return data_source
+
+
+def release_datasource(data_source):
+    """
+    Tells the cache the caller is done with a datasource from open_datasource. The handle is found by identity, so a
+    read handle retired by a later write open is released and not the write handle. When nobody is using a write
+    handle anymore its edits are flushed to disk
+    :param data_source: OGR datasource returned by open_datasource
+    :return:
+    """
+    with _datasource_lock:
+        for key, entry in _datasource_cache.items():
+            if entry[0] is data_source and entry[1] > 0:
+                entry[1] -= 1
+                if entry[1] == 0 and key[1]:
+                    entry[0].FlushCache()
+                _evict_datasources()
+                return
+        for retired in _retired_datasources:
+            if retired[1][0] is data_source:
+                retired[1][1] -= 1
+                if retired[1][1] == 0:
+                    _retired_datasources.remove(retired)
+                    _close_datasource(*retired)
+                return
+
+
+@contextmanager
+def open_layer(in_shp, write=False, driver_name="ESRI Shapefile"):
+    """
+    Context manager that gets a layer from the cache and releases it after, EX: 'with open_layer(path) as layer:'
+    :param in_shp: File path; STRING
+    :param write: True if you want to write the file; BOOL
+    :param driver_name: driver name; STRING
+    :return: OGR layer object
+    """
+    data_source = open_datasource(in_shp, write, driver_name)
+    try:
+        yield _reset_layer(data_source.GetLayer())
+    finally:
+        release_datasource(data_source)
+
+
+def close_datasources(in_shp=None):
+    """
+    Closes the cached datasources of a file for all threads, or every cached datasource. Handles that are still in use
+    are closed when they are released. Call this before the file is changed outside of the cache
+    :param in_shp: File path, None closes all of them; STRING
+    :return:
+    """
+    path = _cache_path(in_shp) if in_shp else None
+    with _datasource_lock:
+        for key in [key for key in _datasource_cache if path is None or key[0] == path]:
+            _drop_datasource(key)
+
+
 #=======================================================================================================================
 # FUNCTIONS
 #=======================================================================================================================
@@ -47,21 +187,24 @@ def read_shp(shp_path):
     pass
 
 
+def _reset_layer(layer):
+    # The cached layer may still have the filters and read position of the last caller
+    set_filters(layer)
+    layer.ResetReading()
+    return layer
+
+
 def get_layer(in_shp, write, driver_name="ESRI Shapefile"):
     """
-    Gets the layer in GDAL, this will help with
+    Gets the layer in GDAL, this will help with. The datasource comes from the cache and stays in use until
+    close_datasources(in_shp) is called. Use open_layer to have it released when you are done, or open_datasource and
+    release_datasource when you need the datasource
     :param in_shp: Shapefile file path; STRING
     :param write: True if you want to write the shp; BOOL
     :param driver_name: driver name; STRING
     :return: OGR layer object
     """
-    driver = ogr.GetDriverByName(driver_name)
-    if(write):
-        data_source = driver.Open(in_shp, 1)
-    else:
-        data_source = driver.Open(in_shp, 0)
-    layer = data_source.GetLayer()
-    return layer
+    return _reset_layer(open_datasource(in_shp, write, driver_name).GetLayer())
 
 
 def delete_shp(in_shp, driver_name="ESRI Shapefile"):
@@ -73,6 +216,7 @@ def delete_shp(in_shp, driver_name="ESRI Shapefile"):
     """
     driver = ogr.GetDriverByName(driver_name)
     if os.path.exists(in_shp):
+        close_datasources(in_shp)
         driver.DeleteDataSource(in_shp)
 
 
@@ -85,21 +229,27 @@ def iterate_rows(in_shp, col_name, write, driver_name="ESRI Shapefile"):
     :param driver_name: driver name; STRING
     :return:
     """
-    layer = get_layer(in_shp, write, driver_name)
-    for feature in layer:
-        print(feature.GetField(col_name))
-    layer.ResetReading()
+    with open_layer(in_shp, write, driver_name) as layer:
+        for feature in layer:
+            print(feature.GetField(col_name))
+        layer.ResetReading()
 
 
-def get_count(in_shp, driver_name="ESRI Shapefile"):
+def get_count(in_shp, driver_name="ESRI Shapefile", selection=None, bbox=None):
     """
     Gets the count of # of rows in a file
     :param in_shp: Shapefile file path; STRING
     :param driver_name: driver name; STRING
+    :param selection: Only count the features that match, see build_attribute_filter; DICT/LIST/STRING
+    :param bbox: Only count the features that intersect (min x, min y, max x, max y); TUPLE
     :return: number of rows in the shapefile
     """
-    layer = get_layer(in_shp, False, driver_name)
-    num_features = layer.GetFeatureCount()
+    with open_layer(in_shp, False, driver_name) as layer:
+        set_filters(layer, selection, bbox)
+        try:
+            num_features = layer.GetFeatureCount()
+        finally:
+            set_filters(layer)
     return num_features
 
 
@@ -125,40 +275,330 @@ def copy(in_path, in_file_name, out_path, out_file_name):
             shutil.copy(os.path.join(in_path, in_file_name_ext), os.path.join(out_path, tmp_copy_value))
 
 
+def sql_literal(value):
+    """
+    Formats a value for an OGR SQL where clause
+    :param value: value to format
+    :return: SQL literal; STRING
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return str(int(value))
+    # numbers.Number also covers the NumPy number types that come from pandas
+    if isinstance(value, numbers.Number):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_attribute_filter(selection):
+    """
+    Builds an OGR SQL where clause from a selection
+    :param selection: A dict of column name to a value or a list of values, EX: {"TYPE": ["A", "B"], "ZONE": 3}. The
+                      values of a column are ORed and the columns are ANDed. A list of these dicts is ORed together.
+                      A string is used as the expression as is, EX: "TYPE IN ('A', 'B') AND (AREA > 10 OR ZONE = 3)"
+    :return: where clause; STRING
+    """
+    if isinstance(selection, str):
+        return selection
+    if isinstance(selection, (list, tuple)):
+        return " OR ".join("(" + build_attribute_filter(sel) + ")" for sel in selection)
+    clauses = []
+    for col, values in selection.items():
+        if isinstance(values, (str, numbers.Number, np.bool_)) or values is None:
+            values = [values]
+        values = list(values)
+        literals = [sql_literal(val) for val in values if val is not None]
+        parts = []
+        if literals:
+            parts.append(f'"{col}" IN ({", ".join(literals)})')
+        if len(literals) < len(values):
+            parts.append(f'"{col}" IS NULL')
+        if not parts:
+            # No values means nothing can match
+            parts.append("1 = 0")
+        clauses.append("(" + " OR ".join(parts) + ")")
+    return " AND ".join(clauses)
+
+
+def set_filters(layer, selection=None, bbox=None):
+    """
+    Sets the attribute and spatial filters of a layer, no arguments clears them. OGR uses the attribute indexes and the
+    spatial index of the file when they exist, see add_index and add_spatial_index
+    :param layer: OGR layer object
+    :param selection: dict of column to values or a where clause, see build_attribute_filter; DICT/LIST/STRING
+    :param bbox: (min x, min y, max x, max y) in the layer's coordinate system; TUPLE
+    :return:
+    """
+    where = build_attribute_filter(selection) if selection else None
+    if layer.SetAttributeFilter(where) != 0:
+        raise ValueError(f"Invalid selection: {where}")
+    if bbox:
+        layer.SetSpatialFilterRect(*bbox)
+    else:
+        layer.SetSpatialFilter(None)
+
+
+def select_features(in_shp, out_shp, selection=None, driver_name="ESRI Shapefile", bbox=None):
+    """
+    Copies the features that match a selection to a new file. OGR does the filtering and the output is written with a
+    single CopyLayer call
+    :param in_shp: Input file path; STRING
+    :param out_shp: Output file path, overwritten if it exists; STRING
+    :param selection: dict of column to values or a where clause, see build_attribute_filter; DICT/LIST/STRING
+    :param driver_name: driver name; STRING
+    :param bbox: Only copy the features that intersect (min x, min y, max x, max y); TUPLE
+    :return: number of features written
+    """
+    driver = ogr.GetDriverByName(driver_name)
+    with open_layer(in_shp, False, driver_name) as in_layer:
+        set_filters(in_layer, selection, bbox)
+        try:
+            delete_shp(out_shp, driver_name)
+            out_source = driver.CreateDataSource(out_shp)
+            out_name = os.path.splitext(os.path.basename(out_shp))[0]
+            out_layer = out_source.CopyLayer(in_layer, out_name)
+            count = out_layer.GetFeatureCount()
+        finally:
+            set_filters(in_layer)
+    # Flush the output to disk
+    out_layer = None
+    out_source = None
+    return count
+
+
 def copy_features(in_shp, out_shp, col, value):
     """
-    Copies selected features to a new shapefile. However, it only allows for a single feature to be selected
-    :param in_shp:
-    :param out_shp:
-    :param col:
-    :param value:
+    Copies selected features to a new shapefile
+    :param in_shp: Input shapefile path; STRING
+    :param out_shp: Output shapefile path; STRING
+    :param col: Column to select on; STRING
+    :param value: Values to select; LIST
+    :return: number of features written
+    """
+    return select_features(in_shp, out_shp, {col: value})
+
+
+def execute_sql(data_source, sql):
+    """
+    Runs an OGR SQL statement that does not return rows
+    :param data_source: OGR datasource opened for writing
+    :param sql: SQL statement; STRING
     :return:
     """
-    '''
-    This only works when there are selections from a single col. If multiple columns want to be added, then I will 
-    need to add the or/and keywords and make multiple for loops with different criteria. 
-    '''
-    with fiona.open(in_shp) as source:
-        source_schema = source.schema
-        source_driver = source.driver
-        source_crs = source.crs
-        # print(source_schema)  # attribute fields & geometry def as dict
-        # print(source_driver)  # "ESRI Shapefile"
-        # print(source_crs)  # coordinate system
-        with fiona.open(out_shp, 'w',
-                        driver=source_driver,
-                        crs=source_crs,
-                        schema=source_schema) as shp_out:
-            for feature in source:
-                for val in value:
-                    if(feature["properties"][col] == val):
-                        shp_out.write(feature)
-    # if(os.path.isfile(os.path.splitext(in_shp)[0] + ".prj")):
-    #     shutil.copy(os.path.splitext(in_shp)[0] + ".prj", os.path.splitext(out_shp)[0] + ".prj")
-
-
-def calculate_field(in_shp, out_shp, expression):
-    pass
+    result = data_source.ExecuteSQL(sql)
+    if result is not None:
+        data_source.ReleaseResultSet(result)
+
+
+def has_spatial_index(in_shp):
+    """
+    Checks if a file has a spatial index that OGR will use for bounding box filters
+    :param in_shp: File path; STRING
+    :return: BOOL
+    """
+    data_source = ogr.Open(in_shp, 0)
+    if data_source is None:
+        raise FileNotFoundError(f"Could not open {in_shp}")
+    return bool(data_source.GetLayer().TestCapability(ogr.OLCFastSpatialFilter))
+
+
+def add_spatial_index(in_shp):
+    """
+    Adds a spatial index. Shapefiles get a .qix file and GeoPackages get an R-tree
+    :param in_shp: File path; STRING
+    :return:
+    """
+    close_datasources(in_shp)
+    data_source = ogr.Open(in_shp, 1)
+    if data_source is None:
+        raise FileNotFoundError(f"Could not open {in_shp}")
+    layer = data_source.GetLayer()
+    layer_name = layer.GetName()
+    driver_name = data_source.GetDriver().GetName()
+    if driver_name == "ESRI Shapefile":
+        execute_sql(data_source, f'CREATE SPATIAL INDEX ON "{layer_name}"')
+    elif driver_name == "GPKG":
+        if not layer.TestCapability(ogr.OLCFastSpatialFilter):
+            execute_sql(data_source, f"SELECT CreateSpatialIndex('{layer_name}', '{layer.GetGeometryColumn()}')")
+    else:
+        raise ValueError(f"Spatial indexes are not supported for {driver_name}")
+    data_source = None
+
+
+def add_index(in_shp, fields, unique=False):
+    """
+    Adds attribute indexes on fields. Shapefiles get .ind/.idm files and GeoPackages get SQLite indexes
+    :param in_shp: File path; STRING
+    :param fields: Field name or list of field names, each gets its own index; STRING/LIST
+    :param unique: Make unique indexes, GeoPackage only; BOOL
+    :return:
+    """
+    if isinstance(fields, str):
+        fields = [fields]
+    close_datasources(in_shp)
+    data_source = ogr.Open(in_shp, 1)
+    if data_source is None:
+        raise FileNotFoundError(f"Could not open {in_shp}")
+    layer_name = data_source.GetLayer().GetName()
+    driver_name = data_source.GetDriver().GetName()
+    for field in fields:
+        if driver_name == "ESRI Shapefile":
+            execute_sql(data_source, f'CREATE INDEX ON "{layer_name}" USING "{field}"')
+        elif driver_name == "GPKG":
+            index_type = "UNIQUE INDEX" if unique else "INDEX"
+            execute_sql(data_source, f'CREATE {index_type} IF NOT EXISTS "idx_{layer_name}_{field}" '
+                                     f'ON "{layer_name}" ("{field}")')
+        else:
+            raise ValueError(f"Attribute indexes are not supported for {driver_name}")
+    data_source = None
+
+
+def compile_expression(expression):
+    """
+    Turns a CalculateField style expression into one pandas can evaluate. Field names can be wrapped in ! like arcpy,
+    EX: "!AREA! * 2 + !WIDTH!" becomes "`AREA` * 2 + `WIDTH`"
+    :param expression: expression over the column names; STRING
+    :return: expression for DataFrame.eval; STRING
+    """
+    return re.sub(r"!([^!]+)!", r"`\1`", expression)
+
+
+def calculate_field(in_shp, out_shp, field, expression, driver_name="ESRI Shapefile"):
+    """
+    Calculates a field over all the rows at once and writes the result in one pass. The expression only has access to
+    the columns and basic operators, EX: "`AREA` * 2", "!TYPE! == 'A'" or "'JOB1'"
+    :param in_shp: Input file path; STRING
+    :param out_shp: Output file path, can be the same as in_shp; STRING
+    :param field: Field to calculate, it is added if it does not exist; STRING
+    :param expression: expression over the column names; STRING
+    :param driver_name: driver name; STRING
+    :return: number of rows calculated
+    """
+    expression = compile_expression(expression)
+    gdf = gpd.read_file(in_shp)
+    # Scalars are broadcast over the column, so a constant expression fills every row
+    gdf[field] = gdf.eval(expression)
+    close_datasources(out_shp)
+    gdf.to_file(out_shp, driver=driver_name)
+    return len(gdf)
+
+
+def map_fields(in_layer, target_layer, field_map=None):
+    """
+    Makes the field index map used by SetFromWithMap
+    :param in_layer: source OGR layer
+    :param target_layer: target OGR layer
+    :param field_map: dict of target field name to source field name. If None, the fields with the same name are
+                      mapped; DICT
+    :return: list with the target field index for each source field, -1 if it is not written; LIST
+    """
+    in_defn = in_layer.GetLayerDefn()
+    target_defn = target_layer.GetLayerDefn()
+    if field_map is None:
+        target_names = {target_defn.GetFieldDefn(i).GetName().lower(): target_defn.GetFieldDefn(i).GetName()
+                        for i in range(target_defn.GetFieldCount())}
+        field_map = {}
+        for i in range(in_defn.GetFieldCount()):
+            name = in_defn.GetFieldDefn(i).GetName()
+            if name.lower() in target_names:
+                field_map[target_names[name.lower()]] = name
+    index_map = [-1] * in_defn.GetFieldCount()
+    for target_name, source_name in field_map.items():
+        source_index = in_defn.GetFieldIndex(source_name)
+        target_index = target_defn.GetFieldIndex(target_name)
+        if source_index < 0:
+            raise ValueError(f"{source_name} is not a field in the source")
+        if target_index < 0:
+            raise ValueError(f"{target_name} is not a field in the target")
+        index_map[source_index] = target_index
+    return index_map
+
+
+def _read_batches(in_shp, columns, where, bbox, batch_size):
+    # Yields the selected features as GeoDataFrames of up to batch_size rows. With pyarrow they are streamed from one
+    # read of the file, without it the selection is read once and split up
+    if importlib.util.find_spec("pyarrow") is None:
+        df = pyogrio.read_dataframe(in_shp, columns=columns, where=where, bbox=bbox)
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start:start + batch_size]
+        return
+    with pyogrio.open_arrow(in_shp, columns=columns, where=where, bbox=bbox, batch_size=batch_size,
+                            use_pyarrow=True) as (meta, reader):
+        geometry_name = meta["geometry_name"] or "wkb_geometry"
+        for batch in reader:
+            df = batch.to_pandas()
+            geometry = gpd.GeoSeries.from_wkb(df.pop(geometry_name), crs=meta["crs"])
+            yield gpd.GeoDataFrame(df, geometry=geometry.rename("geometry"))
+
+
+def append(in_shp, target_shp, field_map=None, selection=None, batch_size=10000, engine="ogr", bbox=None):
+    """
+    Appends the features of one file to another existing file. Both need to be in the same coordinate system
+    :param in_shp: Source file path; STRING
+    :param target_shp: Target file path, it has to exist; STRING
+    :param field_map: dict of target field name to source field name. If None, the fields with the same name are
+                      appended; DICT
+    :param selection: Only append the features that match, see build_attribute_filter; DICT/LIST/STRING
+    :param bbox: Only append the features that intersect (min x, min y, max x, max y); TUPLE
+    :param batch_size: Number of features written in each OGR transaction, or written in each pyogrio batch; INT
+    :param engine: "ogr" streams the features with OGR, "pyogrio" writes batches of batch_size features that are
+                   streamed through Arrow when pyarrow is installed; STRING
+    :return: number of features appended
+    """
+    where = build_attribute_filter(selection) if selection else None
+    # Cached handles of the target would not see the new features
+    close_datasources(target_shp)
+    if engine == "pyogrio":
+        if pyogrio is None:
+            raise ImportError("pyogrio is not installed")
+        columns = list(field_map.values()) if field_map else None
+        target_fields = {name.lower() for name in pyogrio.read_info(target_shp)["fields"]}
+        count = 0
+        for df in _read_batches(in_shp, columns, where, bbox, batch_size):
+            if field_map:
+                df = df.rename(columns={source: target for target, source in field_map.items()})
+            else:
+                # Only write the fields that the target has
+                df = df[[col for col in df.columns if col.lower() in target_fields or col == df.geometry.name]]
+            # Each append call is written in its own transaction
+            pyogrio.write_dataframe(df, target_shp, append=True)
+            count += len(df)
+        return count
+
+    in_source = ogr.Open(in_shp, 0)
+    if in_source is None:
+        raise FileNotFoundError(f"Could not open {in_shp}")
+    target_source = ogr.Open(target_shp, 1)
+    if target_source is None:
+        raise FileNotFoundError(f"Could not open {target_shp}")
+    in_layer = in_source.GetLayer()
+    target_layer = target_source.GetLayer()
+    set_filters(in_layer, where, bbox)
+    index_map = map_fields(in_layer, target_layer, field_map)
+    target_defn = target_layer.GetLayerDefn()
+
+    count = 0
+    target_layer.StartTransaction()
+    try:
+        for feature in in_layer:
+            out_feature = ogr.Feature(target_defn)
+            out_feature.SetFromWithMap(feature, 1, index_map)
+            # OGR only reports a feature it could not write, like one with the wrong geometry type, in the return code
+            if target_layer.CreateFeature(out_feature) != ogr.OGRERR_NONE:
+                raise RuntimeError(f"Could not append feature {feature.GetFID()} of {in_shp} to {target_shp}")
+            count += 1
+            if count % batch_size == 0:
+                target_layer.CommitTransaction()
+                target_layer.StartTransaction()
+        target_layer.CommitTransaction()
+    except Exception:
+        target_layer.RollbackTransaction()
+        raise
+    finally:
+        # Flush the target to disk
+        target_layer = None
+        target_source = None
+        in_source = None
+    return count
 
 
 def custom_geoscopes_function(in_shp, out_shp):
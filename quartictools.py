@@ -5,30 +5,139 @@
 # Imports
 from datetime import datetime, date
 import time
-import arcpy
 import pandas as pd
 import os
+import re
 import sys
+try:
+    import arcpy
+except ImportError:  # read_table_columns() can use OGR when ArcGIS Pro is not installed
+    arcpy = None
 
 # ======================================================================================================================
 # FUNCTIONS
 # ======================================================================================================================
 
 
+def require_arcpy(tool_name):
+    """
+    Raises a clear error when a tool that needs arcpy is used without ArcGIS Pro installed
+    :param tool_name: name of the tool; STRING
+    :return:
+    """
+    if arcpy is None:
+        raise ImportError(f'{tool_name} needs arcpy, which comes with ArcGIS Pro. read_table_columns is the only '
+                          f'reader with an OGR fallback')
+
+
+def clean_columns(df, columns_to_check, char_to_remove, unique_id_fld, target_index=-1, regex=False):
+    """
+    Removes characters from the string columns of a dataframe with vectorized pandas string methods and boolean masks.
+    The dataframe is changed in place. If you specify an index, then the character is only removed from that index
+    :param df: The table to clean; Pandas DataFrame
+    :param columns_to_check: Names of the columns to clean, columns that are not text are skipped; LIST
+    :param char_to_remove: Character or list of characters to remove. If regex is True these are regex patterns; STRING
+                           or LIST
+    :param unique_id_fld: Field with the id that is reported for the changed rows; STRING
+    :param target_index: Index where the character should be removed from, -1 removes it from anywhere; INT
+    :param regex: True if char_to_remove are regex patterns; BOOL
+    :return: Dictionary of which ids changed for each column, Format: {'column1': [ID val1, ID val2]}; DICT
+    """
+    patterns = [char_to_remove] if isinstance(char_to_remove, str) else list(char_to_remove)
+    # Make a single pattern so each column only needs one pass
+    if regex:
+        pattern = '|'.join(f'(?:{p})' for p in patterns)
+    else:
+        pattern = '|'.join(re.escape(p) for p in patterns)
+
+    changed_ids_per_column = {}
+    for col in columns_to_check:
+        values = df[col]
+        try:
+            if target_index == -1:
+                # Remove the characters everywhere, a row changed if the value is different afterwards. Non text values
+                # come back as NaN so they are left out
+                cleaned = values.str.replace(pattern, '', regex=True)
+                changed_rows = cleaned.notna() & values.notna() & cleaned.ne(values)
+            else:
+                # Only look at the character at the index
+                target_char = values.str.get(target_index)
+                if regex:
+                    changed_rows = target_char.str.fullmatch(pattern).fillna(False).astype(bool)
+                else:
+                    changed_rows = target_char.isin(patterns)
+                cleaned = values[changed_rows].str.slice_replace(target_index, target_index + 1, '')
+        except AttributeError:  # The column has no text values, so nothing to clean
+            changed_ids_per_column[col] = []
+            continue
+
+        # Update only the rows that changed
+        if changed_rows.any():
+            df.loc[changed_rows, col] = cleaned[changed_rows]
+        # Add IDs of changed rows to the dictionary for this column
+        changed_ids_per_column[col] = df.loc[changed_rows, unique_id_fld].tolist()
+    return changed_ids_per_column
+
+
+def read_table_columns(fc_path, columns, id_field='OID@'):
+    """
+    Reads only the id field and the given columns of a feature class straight into a pandas df, without writing a
+    temporary file. Rows are streamed from a search cursor, or from an OGR layer when arcpy is not available
+    :param fc_path: path to a feature class; STRING
+    :param columns: Names of the columns to read; LIST
+    :param id_field: Field to identify the rows with, 'OID@' reads the object id; STRING
+    :return: The table with the id field as the first column; Pandas DataFrame
+    """
+    fields = [id_field] + [col for col in columns if col != id_field]
+
+    if arcpy is not None:
+        with arcpy.da.SearchCursor(fc_path, fields) as cursor:
+            return pd.DataFrame.from_records(cursor, columns=fields, coerce_float=False)
+
+    # No arcpy, read the layer with OGR
+    from osgeo import ogr
+    workspace, layer_name = os.path.split(fc_path)
+    if os.path.isfile(fc_path):  # A single file like a shapefile or a geopackage with one layer
+        data_source = ogr.Open(fc_path)
+        layer = data_source.GetLayer()
+    else:  # A layer inside a gdb or other multi layer workspace
+        data_source = ogr.Open(workspace)
+        layer = data_source.GetLayerByName(layer_name)
+    if layer is None:
+        raise ValueError(f'Could not open {fc_path} with OGR')
+
+    # Skip reading the geometry and the fields that are not needed
+    layer_defn = layer.GetLayerDefn()
+    all_fields = [layer_defn.GetFieldDefn(i).GetName() for i in range(layer_defn.GetFieldCount())]
+    layer.SetIgnoredFields([fld for fld in all_fields if fld not in fields] + ['OGR_GEOMETRY', 'OGR_STYLE'])
+
+    data = {fld: [] for fld in fields}
+    for feature in layer:
+        for fld in fields:
+            if fld == 'OID@':
+                data[fld].append(feature.GetFID())
+            else:
+                data[fld].append(feature.GetField(fld))
+    return pd.DataFrame(data, columns=fields)
+
+
 # TODO test this function. I have not tested it all the way through
-def clean_data(fc_path, char_to_remove, tmp_path, unique_id_fld='', only_from_field='all', target_index=-1):
+def clean_data(fc_path, char_to_remove, tmp_path=None, unique_id_fld='', only_from_field='all', target_index=-1,
+               regex=False):
     """
     Takes a table and remove a specific value if the column type is a string. If you specify an index, then the
     character is removed from only that index
     :param fc_path: path to a feature class; STRING
-    :param char_to_remove: character to remove from the files; STRING
-    :param tmp_path: Temporary file path for processing intermediary data; STRING
-    :param unique_id_fld: A unique ID field to match the records. Often GlobalID should be used. If 'none' then a
-    Truncate and append operation will be performed on the table
+    :param char_to_remove: character to remove from the files, or a list of characters; STRING or LIST
+    :param tmp_path: Not used anymore, the table is read in memory. Kept so older calls still work; STRING
+    :param unique_id_fld: A unique ID field to match the records. Often GlobalID should be used. If blank then the
+    object id is used, which is not allowed for versioned data
     :param only_from_field: Only will remove the character from a single field
     :param target_index: Index where the character should be removed from; STRING
-    :return:
+    :param regex: True if char_to_remove are regex patterns instead of plain characters; BOOL
+    :return: Dictionary of which IDs changed for each column; DICT
     """
+    require_arcpy('clean_data')
 
     # Make sure for Versioned datasets that a unique ID field is chosen
     is_versioned = arcpy.Describe(fc_path).isVersioned
@@ -37,41 +146,7 @@ def clean_data(fc_path, char_to_remove, tmp_path, unique_id_fld='', only_from_fi
             print('Need to choose a unique_id_fld for versioned datases, it cannot be blank. Exiting the program now.')
             sys.exit()
 
-    # 1 Read a feature class and export to csv
-    # Check to see if the path exists, if not then make the path
-    if not os.path.exists(tmp_path):
-        os.makedirs(tmp_path)
-    csv_name = 'fc_csv.csv'
-    csv_path = os.path.join(tmp_path, csv_name)
-    # Check if the file exists
-    if os.path.exists(csv_path):
-        # Check if it's a file (not a directory)
-        if os.path.isfile(csv_path):
-            os.remove(csv_path)
-    # Check the pro version because arc works differently with different tools
-    pro_version = arcpy.GetInstallInfo()['Version']
-
-    # Depending on the pro version change the following code
-    if int(pro_version[0]) >= 3 and int(pro_version[2]) > 1:  # Make sure 3.2 or later
-        # Keep the GlobalIDs in the output data without permanently changing the settings
-        with arcpy.EnvManager(preserveGlobalIds=True):
-            arcpy.conversion.ExportTable(in_table=fc_path, out_table=csv_path)  # Doesn't work with pro 3.1.1
-    # Use the old tool for Old pro
-    elif pro_version[0] == '2' or (pro_version[0] == '3' and int(pro_version[2]) < 2):
-        if unique_id_fld == 'GlobalID':
-            print('GlobalID cannot be preserved with the old version of Pro. Try finding another unique field Ending '
-                  'the process now.')
-            sys.exit()
-        else:
-            arcpy.conversion.TableToTable(in_rows=fc_path, out_path=tmp_path, out_name=csv_name)
-    else:
-        print('The ArcGIS Pro will not allow this tool to work. Ending the process now.')
-        sys.exit()
-
-    # 2 Read the csv as a pandas df
-    df = pd.read_csv(csv_path)
-
-    # 3 Make the change to the df and note which fields have been changed
+    # 1 Get the columns to clean
     if only_from_field == 'all':
         # Get a list of columns that are string/text type
         columns_to_check = []
@@ -82,69 +157,89 @@ def clean_data(fc_path, char_to_remove, tmp_path, unique_id_fld='', only_from_fi
     else:
         columns_to_check = [only_from_field]
 
-    # The result of this if else will be a dictionary of which columns changed for the ID field. The difference will be
-    # if there is an index or not
-    if target_index == -1:  # TODO test if this if works
-        # Dictionary to track changes per column
-        changed_ids_per_column = {col: [] for col in columns_to_check}
-
-        # Iterate over each column and modify
-        for col in columns_to_check:
-            # Identify rows where the character exists
-            changed_rows = df[col].str.contains(char_to_remove, na=False)
-
-            # Update the column values by removing the character
-            df[col] = df[col].str.replace(char_to_remove, '', regex=False)
-
-            # Add IDs of changed rows to the dictionary for this column
-            changed_ids_per_column[col] = df.loc[changed_rows, unique_id_fld].tolist()
-
-    else:  # TODO this runs, but not sure if works properly
-        # Dictionary to track changes per column
-        changed_ids_per_column = {col: [] for col in columns_to_check}  # Format: {'column1': [ID val1, ID val2]}
-
-        # Iterate over each column and modify
-        for col in columns_to_check:
-            changed_rows = df[col].apply(
-                lambda x: isinstance(x, str) and len(x) > target_index and x[target_index] == char_to_remove
-                if pd.notna(x) else False
-            )
-            # Update the column values
-            df[col] = df[col].apply(
-                lambda x: x[:target_index] + x[target_index + 1:]
-                if isinstance(x, str) and len(x) > target_index and x[target_index] == char_to_remove else x
-            )
-            # Add IDs of changed rows to the dictionary for this column
-            changed_ids_per_column[col] = df.loc[changed_rows, unique_id_fld].tolist()
-
-    print(changed_ids_per_column)  # TODO temporary testing line, delete after finished
-    df.to_csv('C:\\Users\\rossc\\Downloads\\changed_df_112224.csv', index=False)  # TODO temporary testing line, delete after finished
-    '''
+    # 2 Read only the id and the columns to clean as a pandas df. The id is left alone so the rows can be matched
+    id_field = unique_id_fld if unique_id_fld != '' else 'OID@'
+    columns_to_check = [col for col in columns_to_check if col != id_field]
+    df = read_table_columns(fc_path, columns_to_check, id_field=id_field)
+
+    # 3 Make the change to the df and note which fields have been changed
+    # Clean the columns and get a dictionary of which IDs changed for each column
+    changed_ids_per_column = clean_columns(df, columns_to_check, char_to_remove, id_field,
+                                           target_index=target_index, regex=regex)
+
     # 4 Apply the change to the feature class
-    if unique_id_fld == '':
-        # TODO: do a truncate and append since no unique field (does not work for versioned feature classes)
-        pass
+    write_changes(fc_path, df, changed_ids_per_column, id_field, versioned=is_versioned)
+    return changed_ids_per_column
+
+
+def get_workspace(fc_path):
+    """
+    Gets the workspace (the gdb or sde) that a feature class is in, skipping over a feature dataset
+    :param fc_path: path to a feature class; STRING
+    :return: the workspace path; STRING
+    """
+    require_arcpy('get_workspace')
+    workspace = os.path.dirname(fc_path)
+    if arcpy.Describe(workspace).dataType == 'FeatureDataset':
+        workspace = os.path.dirname(workspace)
+    return workspace
+
+
+def write_changes(fc_path, df, changed_ids_per_column, unique_id_fld, versioned=False):
+    """
+    Writes the changed values of a dataframe back to the feature class. A single update cursor goes over all the changed
+    columns and only the rows that changed are updated, all within one edit operation
+    :param fc_path: path to a feature class; STRING
+    :param df: The cleaned table; Pandas DataFrame
+    :param changed_ids_per_column: Dictionary of which ids changed for each column, Format: {'column1': [ID val1]}; DICT
+    :param unique_id_fld: A unique ID field to match the records; STRING
+    :param versioned: True if the feature class is versioned; BOOL
+    :return: Number of rows updated; INT
+    """
+    require_arcpy('write_changes')
+    # Only the columns with a change need to be in the cursor
+    changed_cols = [col for col, id_list in changed_ids_per_column.items() if id_list]
+    if not changed_cols:
+        print('No changes to write to the feature class')
+        return 0
+
+    # Make a dictionary of the new values for each changed row, Format: {ID val1: {cursor index: new value}}
+    df_by_id = df.drop_duplicates(subset=unique_id_fld).set_index(unique_id_fld)
+    changed_rows = {}
+    for col_idx, col in enumerate(changed_cols, start=1):
+        id_list = changed_ids_per_column[col]
+        for row_id, value in zip(id_list, df_by_id.loc[id_list, col].tolist()):
+            changed_rows.setdefault(row_id, {})[col_idx] = value
+
+    # Write the changes in a single edit operation
+    edit = arcpy.da.Editor(get_workspace(fc_path))  # Edit workspace
+    edit.startEditing(False, versioned)  # args: with_undo, multiuser
+    edit.startOperation()  # Start the editing
+    update_count = 0
+    try:
+        with arcpy.da.UpdateCursor(fc_path, [unique_id_fld] + changed_cols) as cursor:
+            for row in cursor:  # For each row in table
+                new_values = changed_rows.get(row[0])
+                if new_values is None:  # The row did not change
+                    continue
+                for col_idx, value in new_values.items():
+                    row[col_idx] = value
+                cursor.updateRow(row)  # "Save" the update
+                update_count += 1
+    except Exception as e:
+        edit.abortOperation()
+        edit.stopEditing(save_changes=False)
+        print(f"Error: {str(e)}")
+        return 0
     else:
-        # Use the pointer to change that field
-        # loop through the columns
-        for col, id_list in changed_ids_per_column.items():
-            try:
-                with arcpy.da.UpdateCursor(fc_path, [unique_id_fld, col]) as cursor:
-                    for row in cursor:  # For each row in table
-                        # Check if this rows idfield_update is in the dict that matches to idfield_read
-                        if row[0] in id_list:
-                            # If so, get the new column value from the df based on the corresponding id value and update
-                            # the fc
-                            row[1] = df.loc[df[unique_id_fld] == row[0], col].iloc[0]
-                            cursor.updateRow(row)  # "Save" the update
-            except Exception as e:
-                print(e)
-                pass
-        pass
-    '''
+        edit.stopOperation()
+        edit.stopEditing(save_changes=True)  # True to save edits, False to discard
+    print(f'{update_count} rows updated in {fc_path}')
+    return update_count
 
 
 def drop_users(ws):
+    require_arcpy('drop_users')
     arcpy.DisconnectUser(ws, 'ALL')
     print('Users have been disconnected')
 
@@ -174,14 +269,22 @@ def db_connect(envt, db_path, db_base, db_name, feature_class, feature_dataset=F
     return out_path
 
 
-def list_fields(fc_path, include_type=False):
+def list_fields(fc_path, include_type=False, refresh=True):
         """
         Returns a list of field names and types in the feature class.
         :param fc_path: path to a feature class; STRING
         :param include_type: True gives name and type, False is just name; Bool
+        :param refresh: True reads the fields again, False uses the fields cached by the FC class, which are only
+                        updated by the FC schema methods; Bool
         :return: list of columns
         """
-        fields = arcpy.ListFields(fc_path)
+        require_arcpy('list_fields')
+        # Share the cached fields with the FC class
+        from featureclass import get_metadata
+        metadata = get_metadata(fc_path)
+        if refresh:
+            metadata.invalidate_schema()
+        fields = metadata.fields
         if include_type:
             ret_list = []
             for field in fields:
@@ -192,40 +295,33 @@ def list_fields(fc_path, include_type=False):
             return [field.name for field in fields]
 
 
-def load_data(fc_path, csv_file, field_to_update, field_to_read, idfield_update, idfield_read):
+def load_fields(fc_path, csv_file, field_map, idfield_update, idfield_read):
     """
-    Traditionally, how a data load would work is you would join the update table to the feature class on a PK-FK
-    connection. Then you would reclaculate the target field from the FC to the update field from the update table.
-    How this works is it uses the update cursor to write fields from the csv to the fc. It is much faster than
-    joining the fields, calculating, and removing the join. Also avoids the pitfalls from dealing with versioned
-    data that cannot deal with schema changes easily.
+    Loads several fields from a csv in one pass. The csv is read in bulk and every mapped field is updated in a single
+    update cursor pass, only rows with a value that is different are written
     :param fc_path: Path of the Feature Class to update; STRING
     :param csv_file: csv file path for the new data to be updated; STRING
-    :param field_to_update: Name of the field that will be updated in the feature class; STRING
-    :param field_to_read: Name of the field that contains the new data from the csv; STRING
+    :param field_map: Dictionary where the key is the csv field to read and the value is the fc field to update,
+                      EX: {'NEW_NAME': 'NAME', 'NEW_TYPE': 'TYPE'}; DICT
     :param idfield_update: Name of the Primary Key that will connect the proper records of the fc to the csv; STRING
     :param idfield_read: Name of the Foreign Key that will connect the proper records of the csv to the fc; STRING
-    :return:
+    :return: number of rows updated; INT
     """
+    require_arcpy('load_fields')
+    # Share the csv reader and update loop with the FC class
+    from featureclass import read_csv_index, update_rows, get_field_type
     # Set the workspace for where the edit will take place
     workspace = os.path.dirname(fc_path)
     edit = arcpy.da.Editor(workspace)  # Edit workspace
     edit.startEditing(False, True)  # args: with_undo, multiuser
     edit.startOperation()  # Start the editing
+    update_count = 0
     try:
-        # Create a dictionary for the field records that will be updated. The key is the id field and the value is
-        #  update field
-        d = {k: v for k, v in arcpy.da.SearchCursor(csv_file, [idfield_read, field_to_read])}
-        # Method 1
-        with arcpy.da.UpdateCursor(fc_path, [idfield_update, field_to_update]) as cursor:
-            # Method 2
-            # with uc_wrapper.UpdateCursor(shape_to_update, [idfield_update, field_to_update]) as cursor:
-            # Opened the cursor
-
-            for row in cursor:  # For each row in table
-                if row[0] in d:  # Check if this rows idfield_update is in the dict that matches to idfield_read
-                    row[1] = d[row[0]]  # If so, update field_to_update to be field_to_read
-                    cursor.updateRow(row)  # "Save" the update
+        # Create a dictionary for the records that will be updated. The key is the id field and the value is a tuple of
+        # the update fields
+        read_fields = list(field_map)
+        d = read_csv_index(csv_file, idfield_read, read_fields, get_field_type(fc_path, idfield_update))
+        update_count = update_rows(fc_path, d, idfield_update, [field_map[fld] for fld in read_fields])
     except Exception as e:
         edit.abortOperation()
         print(f"Error: {str(e)}")
@@ -234,6 +330,26 @@ def load_data(fc_path, csv_file, field_to_update, field_to_read, idfield_update,
         edit.stopOperation()
         print('Stop the Editing')
         edit.stopEditing(save_changes=True)  # True to save edits, False to discard
+        print(f'{update_count} rows updated')
+        return update_count
+
+
+def load_data(fc_path, csv_file, field_to_update, field_to_read, idfield_update, idfield_read):
+    """
+    Traditionally, how a data load would work is you would join the update table to the feature class on a PK-FK
+    connection. Then you would reclaculate the target field from the FC to the update field from the update table.
+    How this works is it uses the update cursor to write fields from the csv to the fc. It is much faster than
+    joining the fields, calculating, and removing the join. Also avoids the pitfalls from dealing with versioned
+    data that cannot deal with schema changes easily. To load several fields at once use load_fields().
+    :param fc_path: Path of the Feature Class to update; STRING
+    :param csv_file: csv file path for the new data to be updated; STRING
+    :param field_to_update: Name of the field that will be updated in the feature class; STRING
+    :param field_to_read: Name of the field that contains the new data from the csv; STRING
+    :param idfield_update: Name of the Primary Key that will connect the proper records of the fc to the csv; STRING
+    :param idfield_read: Name of the Foreign Key that will connect the proper records of the csv to the fc; STRING
+    :return:
+    """
+    return load_fields(fc_path, csv_file, {field_to_read: field_to_update}, idfield_update, idfield_read)
 
 
 def new_coded_domain(sde_connection, domain_name, code_values, field_type='TEXT', new_dom_desc=''):
@@ -246,6 +362,7 @@ def new_coded_domain(sde_connection, domain_name, code_values, field_type='TEXT'
     :param new_dom_desc: description for the domain, if none is given none will be added; STRING
     :return:
     """
+    require_arcpy('new_coded_domain')
     # Make the domain
     if new_dom_desc == '':
         arcpy.management.CreateDomain(in_workspace=sde_connection, domain_name=domain_name,
@@ -268,6 +385,7 @@ def set_domain_to(sde_connection, domain_name, code_values, temp_table_path='./o
     :param temp_table_path: Temporary path in order to be able to read the table
     :return:
     """
+    require_arcpy('set_domain_to')
     # Get a list of the domain codes by turning the domain into a table then read the table into a list
     # make a table
     arcpy.management.DomainToTable(in_workspace=sde_connection, domain_name=domain_name, out_table=temp_table_path,
@@ -0,0 +1,317 @@
+# Compares the fields described in the Appendix tables of an ADD word document with feature classes and builds the
+# batched schema changes that make the feature classes match the document
+import hashlib
+import re
+import time
+import pandas as pd
+from featureclass import FC, ADD_FIELD_TYPES, SchemaChangePlan, get_metadata
+from tablefromdocx import extract_tables
+
+
+# Column names used in the ADD appendix tables for each field attribute, matched without case
+COLUMN_NAMES = {
+    'name': ['field name', 'name', 'field', 'column name'],
+    'alias': ['alias', 'alias name', 'field alias'],
+    'type': ['data type', 'type', 'field type'],
+    'length': ['length', 'field length', 'size'],
+    'domain': ['domain', 'domain name'],
+    'default': ['default', 'default value'],
+    'nullable': ['nullable', 'allow nulls', 'is nullable'],
+}
+
+# ADD type names to the arcpy Field.type names
+ADD_TYPE_NAMES = {'text': 'String', 'string': 'String', 'short': 'SmallInteger', 'short integer': 'SmallInteger',
+                  'smallinteger': 'SmallInteger', 'long': 'Integer', 'long integer': 'Integer', 'integer': 'Integer',
+                  'big integer': 'BigInteger', 'biginteger': 'BigInteger', 'float': 'Single', 'single': 'Single',
+                  'double': 'Double', 'date': 'Date', 'guid': 'GUID', 'global id': 'GlobalID',
+                  'globalid': 'GlobalID', 'object id': 'OID', 'objectid': 'OID', 'oid': 'OID'}
+
+# Attributes compared between the document and the feature class, in signature order
+SIGNATURE_ATTRIBUTES = ['type', 'alias', 'length', 'domain', 'default', 'nullable']
+
+
+# ======================================================================================================================
+# Helper functions
+# ======================================================================================================================
+def _text(value):
+    """Normalizes a value for comparing, empty values are None and whole floats lose their decimals"""
+    if value is None or value is pd.NA or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def field_table(df):
+    """
+    Renames the columns of an appendix table to the field attributes
+    :param df: appendix table from tablefromdocx; DATAFRAME
+    :return: dataframe with the attribute columns it has, None if the table does not describe fields
+    """
+    names = {}
+    for col in df.columns:
+        key = ' '.join(str(col).lower().split())
+        for attribute, options in COLUMN_NAMES.items():
+            if key in options and attribute not in names.values():
+                names[col] = attribute
+                break
+    if 'name' not in names.values():
+        return None
+    fields = df[list(names)].rename(columns=names)
+    fields = fields[fields['name'].map(_text).notna()]
+    return fields.reset_index(drop=True)
+
+
+def document_attributes(row):
+    """
+    Gets the normalized attributes of a field from a row of the document table
+    :param row: row of a table from field_table; DICT
+    :return: dictionary of attribute to value
+    """
+    attributes = {attribute: _text(row.get(attribute)) for attribute in SIGNATURE_ATTRIBUTES}
+    if attributes['type']:
+        attributes['type'] = ADD_TYPE_NAMES.get(' '.join(attributes['type'].lower().split()), attributes['type'])
+    if attributes['nullable']:
+        attributes['nullable'] = str(attributes['nullable'].lower() in ('true', 'yes', 'y'))
+    return attributes
+
+
+def fc_attributes(field):
+    """
+    Gets the normalized attributes of an arcpy field
+    :param field: arcpy Field object
+    :return: dictionary of attribute to value
+    """
+    return {'type': _text(field.type), 'alias': _text(field.aliasName), 'length': _text(field.length),
+            'domain': _text(field.domain), 'default': _text(field.defaultValue), 'nullable': str(field.isNullable)}
+
+
+def field_length(name, value):
+    """
+    Turns a length from the document into a whole number
+    :param name: field name, used in the message; STRING
+    :param value: length text from the document; STRING
+    :return: length; INT, None if the value is not a positive whole number
+    """
+    try:
+        length = float(value)
+    except (TypeError, ValueError):
+        length = None
+    if length is None or not length.is_integer() or length <= 0:
+        print(f'Skipping the length of {name}, {value} is not a whole number')
+        return None
+    return int(length)
+
+
+def field_signature(attributes, keys):
+    """
+    Hashes the attributes of a field so matching fields are found with one comparison
+    :param attributes: dictionary of attribute to value; DICT
+    :param keys: attributes to include; LIST
+    :return: hex digest; STRING
+    """
+    text = '\x1f'.join(f'{key}={attributes.get(key)}' for key in keys)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+# ======================================================================================================================
+# Pipeline functions
+# ======================================================================================================================
+def read_document_schema(document, cache_dir=None):
+    """
+    Extracts the Appendix tables of an ADD document that describe fields
+    :param document: path of the Word document; STRING
+    :param cache_dir: table cache folder, see tablefromdocx.extract_tables; STRING
+    :return: dictionary of appendix name to field table
+    """
+    schemas = {}
+    for appendix_title, df in extract_tables(document, True, cache_dir=cache_dir).items():
+        fields = field_table(df)
+        if fields is not None:
+            schemas[appendix_title] = fields
+    return schemas
+
+
+def name_words(name):
+    """
+    Splits a name into upper case words on underscores, spaces and punctuation
+    :param name: feature class name or appendix title; STRING
+    :return: list of words; LIST
+    """
+    return [word for word in re.split(r'[\W_]+', name.upper()) if word]
+
+
+def match_appendix(fc_path, appendix_titles):
+    """
+    Finds the appendix of a feature class by looking for the feature class name in the appendix titles. A title that is
+    only the name wins, otherwise the title with the fewest other words, EX: LIGHTS matches 'Appendix_B_Lights' before
+    'Appendix_A_Street_Lights'
+    :param fc_path: path of the feature class; STRING
+    :param appendix_titles: appendix names from read_document_schema; LIST
+    :return: appendix name or None
+    """
+    # Drop the database and owner prefix, EX: gis.GIS.POLES becomes POLES
+    fc_name = fc_path.replace('\\', '/').split('/')[-1].split('.')[-1]
+    fc_words = name_words(fc_name)
+    if not fc_words:
+        return None
+    best_title = None
+    best_extra = None
+    for appendix_title in appendix_titles:
+        # Drop the 'Appendix <Letter>' words so they don't count against the title
+        title_words = name_words(appendix_title)[2:]
+        extra = len(title_words) - len(fc_words)
+        if best_extra is not None and extra >= best_extra:
+            continue
+        # The feature class words have to be next to each other in the title, EX: STREET_LIGHTS in
+        # 'Appendix_A_Street_Lights:_Fields'
+        for i in range(extra + 1):
+            if title_words[i:i + len(fc_words)] == fc_words:
+                best_title, best_extra = appendix_title, extra
+                break
+    return best_title
+
+
+def diff_schema(fields, fc_path):
+    """
+    Compares a field table from the document with the cached fields of a feature class. Only the attributes the
+    document has are compared, and fields whose signatures match are skipped
+    :param fields: field table from read_document_schema; DATAFRAME
+    :param fc_path: path of the feature class; STRING
+    :return: dataframe of differences with the columns field, change, document_value, fc_value
+    """
+    keys = [key for key in SIGNATURE_ATTRIBUTES if key in fields.columns]
+    fc_fields = {field.name.lower(): field for field in get_metadata(fc_path).fields}
+    diffs = []
+    seen = set()
+    for row in fields.to_dict('records'):
+        name = _text(row['name'])
+        seen.add(name.lower())
+        doc_attributes = document_attributes(row)
+        field = fc_fields.get(name.lower())
+        if field is None:
+            diffs.append([name, 'add', doc_attributes.get('type'), None])
+            continue
+        attributes = fc_attributes(field)
+        # The length only means something for text fields
+        if attributes['type'] != 'String' or doc_attributes.get('length') is None:
+            doc_attributes['length'] = attributes['length'] = None
+        row_keys = [key for key in keys if doc_attributes.get(key) is not None]
+        if field_signature(doc_attributes, row_keys) == field_signature(attributes, row_keys):
+            continue
+        for key in row_keys:
+            if doc_attributes[key] != attributes[key]:
+                diffs.append([field.name, key, doc_attributes[key], attributes[key]])
+    for name, field in fc_fields.items():
+        if name not in seen and not field.required:
+            diffs.append([field.name, 'extra', None, field.type])
+    return pd.DataFrame(diffs, columns=['field', 'change', 'document_value', 'fc_value'])
+
+
+def build_plan(diffs, fields, fc, drop_extra=False):
+    """
+    Turns the differences into a batched schema change plan. Type and nullable changes can not be made in place, so
+    they are left in the report for someone to look at
+    :param diffs: differences from diff_schema; DATAFRAME
+    :param fields: field table from read_document_schema; DATAFRAME
+    :param fc: FC object of the feature class
+    :param drop_extra: drop the fields that are not in the document; BOOL
+    :return: SchemaChangePlan
+    """
+    plan = SchemaChangePlan(fc)
+    rows = {_text(row['name']).lower(): document_attributes(row) for row in fields.to_dict('records')}
+    alters = {}
+    for name, change, doc_value, fc_value in diffs.itertuples(index=False):
+        if change == 'add':
+            attributes = rows[name.lower()]
+            field_type = ADD_FIELD_TYPES.get(attributes['type'])
+            if field_type is None:
+                print(f'Cannot add {name}, {attributes["type"]} is not a known field type')
+                continue
+            length = field_length(name, attributes['length']) if field_type == 'TEXT' and attributes['length'] else None
+            plan.add_field(name, field_type, attributes['alias'] or '', length, attributes['default'],
+                           attributes['domain'] or '')
+        elif change == 'extra' and drop_extra:
+            plan.drop_field(name)
+        elif change == 'alias':
+            alters.setdefault(name, {})['alias'] = doc_value
+        elif change == 'length':
+            length = field_length(name, doc_value)
+            if length is not None:
+                alters.setdefault(name, {})['length'] = length
+        elif change == 'domain':
+            plan.assign_domain(name, doc_value)
+        elif change == 'default':
+            plan.assign_default(name, doc_value)
+    # One AlterField call for each field even if the alias and length both changed
+    for name, alter in alters.items():
+        plan.alter_field(name, new_alias=alter.get('alias'), length=alter.get('length'))
+    return plan
+
+
+def validate_feature_classes(document, fc_paths, apply=False, drop_extra=False, cache_dir=None):
+    """
+    Checks feature classes against the fields in an ADD document and builds the changes to make them match
+    :param document: path of the Word document; STRING
+    :param fc_paths: list of feature class paths matched to the appendices by name, or a dictionary of feature class
+                     path to appendix name; LIST/DICT
+    :param apply: run the plans after they are built; BOOL
+    :param drop_extra: drop the fields that are not in the document; BOOL
+    :param cache_dir: table cache folder, see tablefromdocx.extract_tables; STRING
+    :return: (differences dataframe, dictionary of feature class path to SchemaChangePlan, timings dataframe)
+    """
+    start = time.perf_counter()
+    schemas = read_document_schema(document, cache_dir)
+    extract_seconds = time.perf_counter() - start
+    print(f'Extracted {len(schemas)} field tables in {extract_seconds:.2f} seconds')
+
+    if not isinstance(fc_paths, dict):
+        fc_paths = {fc_path: match_appendix(fc_path, list(schemas)) for fc_path in fc_paths}
+
+    diff_list = []
+    plans = {}
+    timings = []
+    for fc_path, appendix_title in fc_paths.items():
+        if appendix_title not in schemas:
+            print(f'No appendix found for {fc_path}, skipping it')
+            continue
+        fields = schemas[appendix_title]
+
+        start = time.perf_counter()
+        diffs = diff_schema(fields, fc_path)
+        diff_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        plan = build_plan(diffs, fields, FC(fc_path), drop_extra)
+        plan_seconds = time.perf_counter() - start
+
+        apply_seconds = None
+        if apply:
+            start = time.perf_counter()
+            plan.execute()
+            apply_seconds = time.perf_counter() - start
+
+        diffs.insert(0, 'feature_class', fc_path)
+        diff_list.append(diffs)
+        plans[fc_path] = plan
+        timings.append([fc_path, appendix_title, extract_seconds, diff_seconds, plan_seconds, apply_seconds])
+
+    if diff_list:
+        report = pd.concat(diff_list, ignore_index=True)
+    else:
+        report = pd.DataFrame(columns=['feature_class', 'field', 'change', 'document_value', 'fc_value'])
+    timings = pd.DataFrame(timings, columns=['feature_class', 'appendix', 'extract', 'diff', 'plan', 'apply'])
+    return report, plans, timings
+
+
+# ======================================================================================================================
+# Test the function
+# ======================================================================================================================
+if __name__ == '__main__':
+    word_path = r'C:\Users\rossc\Documents\ADD_50504_T1DMND0111290_Transportation_3_FCs_W_SAP.docx'
+    feature_classes = [r'C:\Users\rossc\Documents\Transportation.gdb\Poles']
+
+    diff_report, plan_dict, timing_report = validate_feature_classes(word_path, feature_classes)
+    print(diff_report)
+    print(timing_report)
@@ -1,31 +1,245 @@
 # Import statement
-from docx import Document
+from lxml import etree
 import pandas as pd
 import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from os import path
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+
+# WordprocessingML namespace used by the tags in word/document.xml
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+# List of appendix titles to look for
+APPENDICES = ['Appendix A', 'Appendix B', 'Appendix C', 'Appendix D', 'Appendix E', 'Appendix F', 'Appendix G',
+              'Appendix H', 'Appendix I', 'Appendix J', 'Appendix K', 'Appendix L', 'Appendix M', 'Appendix N',
+              'Appendix O', 'Appendix P', 'Appendix Q', 'Appendix R', 'Appendix S', 'Appendix T', 'Appendix U',
+              'Appendix V', 'Appendix W', 'Appendix X', 'Appendix Y', 'Appendix Z']
+
+# Bump this when the extracted tables change so old cache entries are not used
+EXTRACTOR_VERSION = 4
+# Default size cap of the table cache in bytes
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+# Cell values that make a column boolean
+# Single letters like Y and N are left as text since they are often codes
+BOOL_VALUES = {'yes': True, 'no': False, 'true': True, 'false': False}
+# Patterns used when inferring the column types
+NUMBER_PATTERN = r'^[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?$'
+# Commas are only dropped when they group the thousands, so a value like 38,8 stays text
+THOUSANDS_PATTERN = r'^[-+]?\d{1,3}(,\d{3})+(\.\d+)?$'
+LEADING_ZERO_PATTERN = r'^[-+]?0\d'
+# Dates need a 4 digit year so version numbers like 10.2.1 stay text
+DATE_PATTERN = r'^(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}/\d{1,2}/\d{4})([ T]\d{1,2}:\d{2}(:\d{2})?( ?[AaPp][Mm])?)?$'
+DATE_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M',
+                '%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%m/%d/%Y %I:%M %p', '%m/%d/%Y %I:%M:%S %p']
 
 
 # ======================================================================================================================
 # Helper functions
 # ======================================================================================================================
-# Function to save a table as CSV using the csv library
+def _w(tag):
+    return f'{{{W_NS}}}{tag}'
+
+
+# Get the text of a paragraph the same way python-docx does
+def paragraph_text(p):
+    text = []
+    for el in p.iter(_w('t'), _w('tab'), _w('br'), _w('cr')):
+        if el.tag == _w('t'):
+            text.append(el.text or '')
+        elif el.tag == _w('tab'):
+            text.append('\t')
+        else:
+            text.append('\n')
+    return ''.join(text)
+
+
+# Get the text of a cell, one line per paragraph
+def cell_text(tc):
+    return '\n'.join(paragraph_text(p) for p in tc.iterchildren(_w('p')))
+
+
+# Read the rows of a w:tbl element. Like python-docx row.cells, a cell merged across columns repeats its text in each
+# column and a cell merged down the rows repeats the text of the top cell. With repeat_merged False, a cell merged
+# across columns only has its text in the first column and the rest are None
+def table_rows(tbl, repeat_merged=True):
+    rows = []
+    for tr in tbl.iterchildren(_w('tr')):
+        row = []
+        for tc in tr.iterchildren(_w('tc')):
+            span = 1
+            v_merge = None
+            tc_pr = tc.find(_w('tcPr'))
+            if tc_pr is not None:
+                grid_span = tc_pr.find(_w('gridSpan'))
+                if grid_span is not None:
+                    span = int(grid_span.get(_w('val'), 1))
+                v_merge_el = tc_pr.find(_w('vMerge'))
+                if v_merge_el is not None:
+                    v_merge = v_merge_el.get(_w('val'), 'continue')
+            col = len(row)
+            if v_merge == 'continue' and rows and col < len(rows[-1]):
+                text = rows[-1][col]
+            else:
+                text = cell_text(tc)
+            if repeat_merged:
+                row.extend([text] * span)
+            else:
+                row.extend([text] + [None] * (span - 1))
+        rows.append(row)
+    return rows
+
+
+# Get the rows of a table as lists of strings, from a python-docx table, a dataframe or rows that are already read
+def table_values(table):
+    if isinstance(table, list):
+        return table
+    if isinstance(table, pd.DataFrame):
+        return table.values.tolist()
+    return [[cell.text for cell in row.cells] for row in table.rows]
+
+
+# A table without a header row has the positions as column names
+def has_column_names(df):
+    return list(df.columns) != list(range(len(df.columns)))
+
+
+# Fill the cells left empty by table_rows with repeat_merged False with the text of the merged cell before them
+def fill_merged_cells(row):
+    filled = []
+    for cell in row:
+        filled.append(filled[-1] if cell is None and filled else cell or '')
+    return filled
+
+
+# Function to save a table as CSV using the csv library. Rows are written with the text in the document, a dataframe
+# is written with its column names and types
 def save_table_as_csv(table, file_path):
+    if isinstance(table, pd.DataFrame):
+        table.to_csv(file_path, index=False, header=has_column_names(table), encoding='utf-8')
+        return
     with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile)
-        for row in table.rows:
-            row_data = [cell.text.strip() for cell in row.cells]
+        for row in table_values(table):
+            row_data = [cell.strip() for cell in fill_merged_cells(row)]
             writer.writerow(row_data)
 
 
-# Convert the table to a Pandas DF
-def save_table_info(table):
-    data = []
-    for row in table.rows:
-        row_data = []
-        for cell in row.cells:
-            row_data.append(cell.text)
-        data.append(row_data)
-    df = pd.DataFrame(data)
+# Drop the thousands separators of a number, other commas are kept so the value does not match as a number
+def number_text(value):
+    return value.replace(',', '') if re.match(THOUSANDS_PATTERN, value) else value
+
+
+# A row where every cell has the same text, like a caption merged across the whole table
+def is_caption_row(row):
+    values = {cell.strip() for cell in row if cell is not None and cell.strip()}
+    return len(row) > 1 and len(values) <= 1
+
+
+# Find the index of the header row: the first row after the caption rows, if every cell has text, none of them are
+# numbers and there are rows after it. None if the table has no header
+def detect_header(rows):
+    row_idx = 0
+    while row_idx < len(rows) and is_caption_row(rows[row_idx]):
+        row_idx += 1
+    if row_idx >= len(rows) - 1:
+        return None
+    cells = [cell.strip() for cell in rows[row_idx] if cell is not None]
+    if not cells or not all(cells) or any(re.match(NUMBER_PATTERN, number_text(cell)) for cell in cells):
+        return None
+    return row_idx
+
+
+# Make unique column names from the header row. A header cell merged across columns gets the name of the first
+# column with a suffix
+def column_names(header_row):
+    names = []
+    for col_idx, cell in enumerate(header_row):
+        name = ' '.join(cell.split()) if cell else ''
+        if not name:
+            name = f'{names[-1]}_2' if names and cell is None else f'Column_{col_idx}'
+        unique_name = name
+        count = 2
+        while unique_name in names:
+            unique_name = f'{name}_{count}'
+            count += 1
+        names.append(unique_name)
+    return names
+
+
+# Convert the text columns to boolean, integer, float and date columns when every value in the column fits the type
+def infer_column_types(df):
+    for col in df.columns:
+        text = df[col].astype('string').str.strip()
+        text = text.mask(text == '')
+        values = text.dropna()
+        if values.empty:
+            df[col] = text
+            continue
+        lower = values.str.lower()
+        numbers = text.map(number_text, na_action='ignore')
+        if lower.isin(BOOL_VALUES.keys()).all():
+            df[col] = text.str.lower().map(BOOL_VALUES).astype('boolean')
+        elif numbers.dropna().str.match(NUMBER_PATTERN).all() and not values.str.match(LEADING_ZERO_PATTERN).any():
+            column = pd.to_numeric(numbers)
+            if (column.dropna() % 1 == 0).all():
+                column = column.astype('Int64')
+            df[col] = column
+        elif values.str.match(DATE_PATTERN).all():
+            df[col] = parse_dates(text, len(values))
+        else:
+            df[col] = text
+    return df
+
+
+# Parse a text column with the date formats, each value uses the first format that fits it. The text is returned
+# if any value does not fit one of them
+def parse_dates(text, count):
+    dates = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    for date_format in DATE_FORMATS:
+        missing = dates.isna() & text.notna()
+        if not missing.any():
+            break
+        dates[missing] = pd.to_datetime(text[missing], errors='coerce', format=date_format)
+    return dates if dates.notna().sum() == count else text
+
+
+# Convert the table to a Pandas DF with the header row as the column names and typed columns. The text of the
+# caption rows above the header is kept in df.attrs['captions']
+def save_table_info(table, header='auto', infer_types=True):
+    """
+    :param table: rows of cell text, a python-docx table or a dataframe (returned as is)
+    :param header: 'auto' to detect the header row, the index of the header row, or None for no header
+    :param infer_types: convert the columns to boolean, numeric and date types when all their values fit; BOOL
+    :return: dataframe of the table
+    """
+    if isinstance(table, pd.DataFrame):
+        return table
+    rows = table_values(table)
+    if header == 'auto':
+        header = detect_header(rows)
+    if header is None:
+        df = pd.DataFrame(rows)
+    else:
+        width = max(len(row) for row in rows)
+        names = column_names(list(rows[header]) + [''] * (width - len(rows[header])))
+        df = pd.DataFrame(rows[header + 1:], columns=names[:width])
+    if infer_types:
+        df = infer_column_types(df)
+    captions = rows[:header] if header else []
+    df.attrs['captions'] = [next((cell.strip() for cell in row if cell and cell.strip()), '') for row in captions]
     return df
 
 
@@ -34,10 +248,155 @@ def save_tables_to_csv(table, output_filename):
     table.to_csv(output_filename, index=True)
 
 
+# Stream through the document body and yield the tables that come directly after an Appendix title
+def iter_appendix_tables(document, repeat_merged=True):
+    """
+    Reads word/document.xml in one pass with iterparse. Each body table is paired with the paragraph right before it,
+    and the body elements are cleared as soon as they are read so memory stays flat on large documents
+    :param document: path of the Word document or a file object; STRING
+    :param repeat_merged: repeat the text of cells merged across columns in each column, see table_rows; BOOL
+    :return: generator of (appendix title, rows of cell text)
+    """
+    body_tag = _w('body')
+    with zipfile.ZipFile(document) as docx_zip:
+        with docx_zip.open('word/document.xml') as xml_file:
+            appendix_title = None
+            for event, element in etree.iterparse(xml_file, events=('end',), tag=(_w('p'), _w('tbl'), _w('sdt'))):
+                parent = element.getparent()
+                # Paragraphs and tables inside of tables are read with their table
+                if parent is None or parent.tag != body_tag:
+                    continue
+                if element.tag == _w('tbl') and appendix_title:
+                    yield appendix_title, table_rows(element, repeat_merged)
+                appendix_title = None
+                if element.tag == _w('p'):
+                    # Checks if the first two words are 'Appendix <Letter>'
+                    para_text = paragraph_text(element).strip()
+                    if ' '.join(para_text.split()[:2]) in APPENDICES:
+                        # Make the appendix title as a file name
+                        appendix_title = para_text.replace(' ', '_')
+                # Free the block and the ones before it
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+
+
+# ======================================================================================================================
+# Cache functions
+# ======================================================================================================================
+def document_key(document):
+    """
+    Makes the cache key of a document from the hash of its content and the extractor version
+    :param document: path of the Word document; STRING
+    :return: cache key; STRING
+    """
+    sha = hashlib.sha256()
+    with open(document, 'rb') as docx_file:
+        for chunk in iter(lambda: docx_file.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return f'{sha.hexdigest()}_v{EXTRACTOR_VERSION}'
+
+
+def read_cached_tables(cache_dir, key):
+    """
+    Reads the tables of a document from the cache and marks the entry as recently used
+    :param cache_dir: cache folder; STRING
+    :param key: cache key from document_key; STRING
+    :return: dictionary of the rows of cell text with the appendix name as the key, None if it is not cached
+    """
+    index_path = path.join(cache_dir, key, 'index.json')
+    try:
+        with open(index_path, encoding='utf-8') as index_file:
+            index = json.load(index_file)
+        table_dict = {}
+        for table in index['tables']:
+            df = feather.read_feather(path.join(cache_dir, key, table['file'])).astype(object)
+            values = df.where(df.notna(), None).values.tolist()
+            # Short rows were padded to fit in the table, the real widths are kept in the index
+            table_dict[table['title']] = [row[:width] for row, width in zip(values, table['widths'])]
+    except (OSError, ValueError, KeyError):
+        return None
+    os.utime(index_path)
+    return table_dict
+
+
+def write_cached_tables(cache_dir, key, table_dict):
+    """
+    Writes the tables of a document to the cache. The entry is written to a temporary folder and renamed so other
+    processes never see a partial entry
+    :param cache_dir: cache folder; STRING
+    :param key: cache key from document_key; STRING
+    :param table_dict: dictionary of the rows of cell text with the appendix name as the key; DICT
+    :return:
+    """
+    entry_dir = path.join(cache_dir, key)
+    tmp_dir = f'{entry_dir}.{os.getpid()}.tmp'
+    os.makedirs(tmp_dir, exist_ok=True)
+    index = {'version': EXTRACTOR_VERSION, 'tables': []}
+    for table_idx, (title, rows) in enumerate(table_dict.items()):
+        file_name = f'{table_idx}.feather'
+        df = pd.DataFrame(rows, dtype=object)
+        # Feather needs string column names
+        df.columns = [str(col_idx) for col_idx in range(len(df.columns))]
+        feather.write_feather(df, path.join(tmp_dir, file_name))
+        index['tables'].append({'title': title, 'file': file_name, 'widths': [len(row) for row in rows]})
+    with open(path.join(tmp_dir, 'index.json'), 'w', encoding='utf-8') as index_file:
+        json.dump(index, index_file)
+    try:
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # Another process already cached the same document
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def evict_cache(cache_dir, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Deletes the least recently used entries until the cache is under its size cap
+    :param cache_dir: cache folder; STRING
+    :param cache_size: size cap in bytes; INT
+    :return:
+    """
+    entries = []
+    total_size = 0
+    for entry in os.scandir(cache_dir):
+        index_path = path.join(entry.path, 'index.json')
+        if not entry.is_dir() or not path.isfile(index_path):
+            continue
+        size = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+        entries.append((path.getmtime(index_path), size, entry.path))
+        total_size += size
+    for mtime, size, entry_path in sorted(entries):
+        if total_size <= cache_size:
+            break
+        shutil.rmtree(entry_path, ignore_errors=True)
+        total_size -= size
+
+
+def cached_extract(document, cache_dir, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Gets the appendix tables of a document from the cache, extracting and caching them if the document changed. The
+    cell text is cached as it is in the document so the CSVs and dataframes are made from the same rows
+    :param document: path of the Word document; STRING
+    :param cache_dir: cache folder; STRING
+    :param cache_size: size cap of the cache in bytes; INT
+    :return: dictionary of the rows of cell text with the appendix name as the key
+    """
+    if feather is None:
+        raise ImportError('pyarrow is needed to cache the tables')
+    key = document_key(document)
+    table_dict = read_cached_tables(cache_dir, key)
+    if table_dict is None:
+        table_dict = dict(iter_appendix_tables(document, repeat_merged=False))
+        os.makedirs(cache_dir, exist_ok=True)
+        write_cached_tables(cache_dir, key, table_dict)
+        evict_cache(cache_dir, cache_size)
+    return table_dict
+
+
 # ======================================================================================================================
 # Main Function
 # ======================================================================================================================
-def extract_tables(document, pandas_tables=False, output_location=''):
+def extract_tables(document, pandas_tables=False, output_location='', cache_dir=None, cache_size=DEFAULT_CACHE_SIZE):
     """
     This tool reads an ADD word document and extracts the tables in the Appendix section.
     :param document: path of the Word document; STRING
@@ -46,108 +405,115 @@ def extract_tables(document, pandas_tables=False, output_location=''):
     appendix name; BOOL
     :param output_location: Output file location for the table(s). Do not specify the name, will e named the Appendix
     title; STRING
+    :param cache_dir: default None. If set, the tables are cached in this folder by the content of the document and
+    an unchanged document is not parsed again; STRING
+    :param cache_size: size cap of the cache in bytes, the least recently used documents are removed first; INT
     :return: (conditionally) A dictionary of pandas dataframes representing the table(s) in the appendix section with
-     the key being the name of the appendix
-    """
-
-    # Convert the Word document into a docx object
-    doc = Document(document)
-
-    # List of appendix titles to look for
-    appendices = ['Appendix A', 'Appendix B', 'Appendix C', 'Appendix D', 'Appendix E', 'Appendix F', 'Appendix G',
-                  'Appendix H', 'Appendix I', 'Appendix J', 'Appendix K', 'Appendix L', 'Appendix M', 'Appendix N',
-                  'Appendix O', 'Appendix P', 'Appendix Q', 'Appendix R', 'Appendix S', 'Appendix T', 'Appendix U',
-                  'Appendix V', 'Appendix W', 'Appendix X', 'Appendix Y', 'Appendix Z']
-
-    # Reset the index to 0
-    index_counter = 0
-    # Black list that will store the index of the table location in the Word document
-    tbl_index_list = []
-
-    # Loop through the document and look at the blocks of information
-    for block in doc.element.body:
-        # Determine which blocks are tables
-        if block.tag.endswith('tbl'):
-            # Mark the index of the blocks that are tables
-            tbl_index_list.append(index_counter)
-        # Move the counter by 1
-        index_counter += 1
-
-    # Make a list for the index of the text paragraphs that comes directly before the tables
-    p_index_list = [num - 1 for num in tbl_index_list]
-
-    # Reset the index to 0
-    index_counter = 0
-
-    # Empty list that will be filled with smaller lists that represent the index of the block for the table, appendix
-    # name, and eventually the index of the table in the list of tables in the document
-    title_list = []
-    for block in doc.element.body:
-        # Mini list that will be appended to the title_list that contain the important info
-        temp_list = []
-        # Go through the P index list
-        if index_counter in p_index_list:
-            # get the text for the paragraph
-            para_text = block.text.strip()
-            # Get the first two words to ensure it is an Appendix (could be an appendix elsewhere though)
-            words = para_text.split()
-            beginning = " ".join(words[:2])
-
-            # Checks if the first two words are 'Appendix <Letter>'
-            if beginning in appendices:
-                # Make the appendix title as a file name
-                appendix_title = para_text.replace(" ", "_")
-                tbl_index = index_counter + 1  # table block is one after the Appendix block
-                # populate the mini list
-                temp_list.append(tbl_index)
-                temp_list.append(appendix_title)
-                # add the mini list to the title_list
-                title_list.append(temp_list)
-
-        # Increase the index by one
-        index_counter += 1
-
-    # Append the value of the index of the table for the list of tables
-    for place_idx in range(len(tbl_index_list)):
-        # value of the block_index
-        block_index = tbl_index_list[place_idx]
-        # Go through the other list to see if you can append the value
-        for mini_list in title_list:
-            if mini_list[0] == block_index:
-                mini_list.append(place_idx)
+     the key being the name of the appendix, otherwise the list of CSV files written
+    """
+
+    # Get the rows of the tables from the cache or straight from the document. Merged cells are only kept in their
+    # first column
+    if cache_dir:
+        tables = cached_extract(document, cache_dir, cache_size).items()
+    else:
+        tables = iter_appendix_tables(document, repeat_merged=False)
 
     # If true return a dictionary of the dataframes
     if pandas_tables:
         df_dict = {}
-        # Go through the doc table list and print only the tables that are in the index of the last item of the list
-        for table_idx in range(len(doc.tables)):
-            # Loop through the title_list to see if the table is to be exported
-            for title_idx in title_list:
-                # If the table is a match print it out
-                if title_idx[2] == table_idx:
-                    tbl = doc.tables[table_idx]
-                    # Turn the table into a dataframe
-                    df = save_table_info(tbl)
-                    # Set the df to be the value of the dict and the name to be the appendix name
-                    df_dict[title_idx[1]] = df
+        for appendix_title, rows in tables:
+            # Set the df to be the value of the dict and the name to be the appendix name
+            df_dict[appendix_title] = save_table_info(rows)
         # Return the dictionary
         return df_dict
 
     # Export the tables to an output location of the user's choosing
     else:
-        # Go through the doc table list and print only the tables that are in the index of the last item of the list
-        for table_idx in range(len(doc.tables)):
-            # Loop through the title_list to see if the table is to be exported
-            for title_idx in title_list:
-                # If the table is a match print it out
-                if title_idx[2] == table_idx:
-                    # Pulls the table at the appropriate index
-                    tbl = doc.tables[table_idx]
-                    csv_filename = f'{title_idx[1]}.csv'
-                    # Combine the filename with the out path set by the user
-                    csv_full_path = path.join(output_location, csv_filename)
-                    # Export as a csv
-                    save_table_as_csv(tbl, csv_full_path)
+        csv_list = []
+        for appendix_title, rows in tables:
+            csv_filename = f'{appendix_title}.csv'
+            # Combine the filename with the out path set by the user
+            csv_full_path = path.join(output_location, csv_filename)
+            # Export as a csv with the text in the document
+            save_table_as_csv(rows, csv_full_path)
+            csv_list.append(csv_full_path)
+        return csv_list
+
+
+# ======================================================================================================================
+# Batch Function
+# ======================================================================================================================
+def find_documents(documents):
+    """
+    Gets the list of Word documents to extract
+    :param documents: a folder, a glob pattern like 'C:/ADDs/*.docx' or a list of document paths; STRING/LIST
+    :return: list of document paths; LIST
+    """
+    if not isinstance(documents, str):
+        return list(documents)
+    if path.isdir(documents):
+        documents = path.join(documents, '*.docx')
+    # Skip the lock files Word makes for open documents
+    return sorted(doc for doc in glob.glob(documents) if not path.basename(doc).startswith('~$'))
+
+
+# Runs in the worker processes, so it has to be at the module level
+def _extract_document(document, pandas_tables, output_folder, cache_dir):
+    start = time.perf_counter()
+    try:
+        if not pandas_tables:
+            os.makedirs(output_folder, exist_ok=True)
+        tables = extract_tables(document, pandas_tables, output_folder, cache_dir)
+        return document, tables, time.perf_counter() - start, None
+    except Exception as e:
+        return document, None, time.perf_counter() - start, f'{type(e).__name__}: {e}'
+
+
+def extract_tables_batch(documents, pandas_tables=False, output_location='', max_workers=None, cache_dir=None):
+    """
+    Extracts the Appendix tables of many ADD word documents at once using a pool of processes. A document that fails is
+    reported and the rest of the batch keeps going
+    :param documents: a folder, a glob pattern or a list of document paths; STRING/LIST
+    :param pandas_tables: default False. If False the tables of each document are written as CSVs to a folder named
+    after the document in output_location. If True a dictionary of pandas dataframes is returned with the key being
+    (document name, appendix name); BOOL
+    :param output_location: Folder where the per document folders are made; STRING
+    :param max_workers: number of processes, defaults to the number of CPUs; INT
+    :param cache_dir: default None. If set, the tables are cached in this folder, see extract_tables; STRING
+    :return: a dataframe reporting the document, number of tables, seconds and error of each document. If pandas_tables
+    is True, (dictionary of dataframes, report)
+    """
+    doc_list = find_documents(documents)
+    df_dict = {}
+    report = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for document in doc_list:
+            doc_name = path.splitext(path.basename(document))[0]
+            output_folder = path.join(output_location, doc_name)
+            futures[executor.submit(_extract_document, document, pandas_tables, output_folder, cache_dir)] = document
+        for future in as_completed(futures):
+            try:
+                document, tables, seconds, error = future.result()
+            except Exception as e:
+                # The worker process itself died
+                document, tables, seconds, error = futures[future], None, None, f'{type(e).__name__}: {e}'
+            doc_name = path.splitext(path.basename(document))[0]
+            if error:
+                print(f'Failed to extract {document}: {error}')
+            elif pandas_tables:
+                for appendix_title, df in tables.items():
+                    df_dict[(doc_name, appendix_title)] = df
+            report.append({'document': document, 'tables': len(tables) if tables else 0, 'seconds': seconds,
+                           'error': error})
+
+    report = pd.DataFrame(report, columns=['document', 'tables', 'seconds', 'error'])
+    report = report.sort_values('document', ignore_index=True)
+    print(f'Extracted {(report["error"].isna()).sum()} of {len(doc_list)} documents')
+    if pandas_tables:
+        return df_dict, report
+    return report
 
 
 # ======================================================================================================================